@@ -11,7 +11,9 @@ os.chdir('src/search')
 
 def get_heuristics(domain, search_conf):
     heuristics = domain.heuristics.get(search_conf['heuristic'], domain.heuristics['zero'])
-    return heuristics[0], heuristics[0], heuristics[1]
+    # Domain heuristic objects are module-level, so the tables they prepare for a problem are
+    # shared by every searcher and degradation run on it
+    return tuple(helpers.as_heuristic(h) for h in (heuristics[0], heuristics[0], heuristics[1]))
 
 
 def get_config():
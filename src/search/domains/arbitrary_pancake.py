@@ -8,10 +8,10 @@ Typical use:
 """
 
 from collections import namedtuple
-import math
 import random
 
-from src.search.utils.datastructures import Problem
+from src.search.utils.datastructures import LRUCache, Problem
+from src.search.utils.helpers import pancake, pdb
 
 
 class State:
@@ -25,6 +25,8 @@ class State:
         n_successors: Number of successors of the state.
         successors_list: Lazily-calculated list of (state, cost)
             tuples, as the successors of self.
+        flip: Index of the flip giving the state from its parent, or
+            None if the state is interned or has no parent.
     """
 
     def __init__(self, state):
@@ -32,13 +34,16 @@ class State:
         self.state = state
         self.n_successors = len(self.state) - 2
         self.successors_list = None
+        self.flip = None
 
     def successors(self, problem):
         """Get successors of self, sorted by cost.
 
         Lazily calculates the successors. If function hasn't been
         called before, successors are calculated and stored.
-        If stored list exists, it is simply retrieved.
+        If stored list exists, it is simply retrieved. If the problem
+        has a successor cache, successors are stored there rather
+        than on the state, and may be evicted and recalculated.
 
         Args:
             problem: namedtuple object as created in parse_problem().
@@ -46,16 +51,31 @@ class State:
         Returns:
             A sorted list of the successors of self.
         """
+        cache = problem.successor_cache
+        if cache is not None:
+            successors = cache.get(self)
+            if successors is None:
+                successors = self._successors(problem)
+                cache.put(self, successors)
+            return successors
         if self.successors_list is None:
-            self.successors_list = []
-            for i in range(len(self.state) - 2, 0, -1):
-                first = [self.state[j] for j in range(i)]
-                second = [self.state[j] for j in range(len(self.state)-1, i-1, -1)]
-                new_state = State(tuple(first + second))
-                self.successors_list.append((new_state, cost(self, new_state, problem=problem)))
-            self.successors_list = sorted(self.successors_list, key=lambda x: x[1])
+            self.successors_list = self._successors(problem)
         return self.successors_list
 
+    def _successors(self, problem):
+        """Calculates the successors of self, as a list of
+        (state, cost) tuples sorted by cost.
+
+        Args:
+            problem: namedtuple object as created in parse_problem().
+        """
+        successors = []
+        s = self.state
+        for i, child in reversed(pancake.flips(s)):
+            new_state = pancake.intern_state(type(self)(child), problem, flip=i)
+            successors.append((new_state, flip_cost(s, i)))
+        return sorted(successors, key=lambda x: x[1])
+
     def __hash__(self):
         return hash(self.state)
 
@@ -63,10 +83,20 @@ class State:
         return f'State(state={self.state})'
 
     def __eq__(self, other):
-        return self.state == other.state
+        return self is other or self.state == other.state
+
+
+class PackedState(pancake.PackedStateMixin, State):
+    """State class for the arbitrary-cost pancake domain, holding the stack
+    packed into a single int. See pancake.PackedStateMixin.
+    """
+
 
+encodings = {'tuple': State,
+             'packed': PackedState}
 
-def parse_problem(problem_str):
+
+def parse_problem(problem_str, encoding='tuple', intern=False, successor_cache=None):
     """Create namedtuple instance of specified problem.
 
     Creates a namedtuple instance containing various information about
@@ -82,15 +112,28 @@ def parse_problem(problem_str):
 
                 A stack of five pancakes, with '1' being the smallest,
                 5 the largest, and 6 the base.
+        encoding: Name of the State class to use, one of 'tuple'
+            and 'packed' (see encodings).
+        intern: If True, the problem is given an intern table, so
+            that each distinct state is created once.
+        successor_cache: If given, the greatest number of states
+            whose successors are held in the problem's LRU successor
+            cache. Otherwise each state holds its own successors.
 
     Returns:
         A namedtuple containing problem information.
     """
+    if encoding not in encodings:
+        raise Exception(f'Unknown state encoding: {encoding}. Options are {list(encodings)}')
+    state_type = encodings[encoding]
     initial_tuple = tuple(map(int, problem_str.split(' ')))
     goal_tuple = tuple(range(len(initial_tuple), 0, -1))
-    problem = Problem(initial=State(initial_tuple),
-                      goal=State(goal_tuple),
-                      epsilon=1)
+    initial, goal = state_type(initial_tuple), state_type(goal_tuple)
+    problem = Problem(initial=initial,
+                      goal=goal,
+                      epsilon=1,
+                      intern={initial: initial, goal: goal} if intern else None,
+                      successor_cache=LRUCache(successor_cache) if successor_cache else None)
     return problem
 
 
@@ -112,11 +155,15 @@ def generate_problems(config):
             problems.
     """
     problems = []
+    encoding = config.settings.get('encoding', 'tuple')
+    intern = config.settings.get('intern', False)
+    successor_cache = config.settings.get('successor_cache')
     if config.settings['precompiled']:
         for file_name in config.settings['precompiled']:
             with open(file_name, 'r') as f:
                 for line in f:
-                    problems.append(parse_problem(line))
+                    problems.append(parse_problem(line, encoding=encoding, intern=intern,
+                                                  successor_cache=successor_cache))
     else:
         try:
             n_problems = config.settings['n_problems']
@@ -128,7 +175,8 @@ def generate_problems(config):
             x = [i for i in range(1, param)]
             random.shuffle(x)
             problem_str = ' '.join(map(str, [param] + x))
-            problems.append(parse_problem(problem_str))
+            problems.append(parse_problem(problem_str, encoding=encoding, intern=intern,
+                                          successor_cache=successor_cache))
 
     return problems
 
@@ -155,6 +203,22 @@ def cost(state, other, problem):
     return len(state_1) - i
 
 
+def flip_cost(stack, i):
+    """Returns the cost of the flip at index i, the number of pancakes
+    flipped, without comparing the parent and child stacks.
+
+    Args:
+        stack: Parent stack, as a tuple of pancakes.
+        i: Index of the lowest pancake flipped.
+    """
+    return len(stack) - i
+
+
+# Dense ranks of states, for the 'ranked' closed-list
+rank_state = pancake.rank_state_of
+n_ranks = pancake.n_ranks_of
+
+
 def _not_adjacent(p1, p2, state):
     """Determines whether or not two pancakes are adjacent in a given
     state.
@@ -175,7 +239,7 @@ def _not_adjacent(p1, p2, state):
     return adj
 
 
-def largest_pancake_heuristic_fw(state, goal, degradation, problem):
+def largest_pancake_heuristic_fw(state, goal, degradation, problem, parent=None):
     """Forward direction 'Largest pancake' Heuristic function for the
     arbitrary-pancake domain.
 
@@ -193,17 +257,19 @@ def largest_pancake_heuristic_fw(state, goal, degradation, problem):
         degradation: An integer between 0 and 10 inclusive.
         problem: A namedtuple instance representing a arbitrary-pancake
             problem.
+        parent: Unused.
 
     Returns:
         A non-negative integer value for the heuristic value of state.
     """
     if state == goal:
         return 0
-    stop_condition = len(goal.state) - math.floor((degradation / 10) * len(goal.state))
-    return state.state[max(i for i in range(1, stop_condition) if state.state[i] != goal.state[i])]
+    s, g = state.state, goal.state
+    stop_condition = pancake.stop_index(len(g), degradation)
+    return s[max(i for i in range(1, stop_condition + 1) if s[i] != g[i])]
 
 
-def largest_pancake_heuristic_bw(state, goal, degradation, problem):
+def largest_pancake_heuristic_bw(state, goal, degradation, problem, parent=None):
     """Backward direction 'Largest Pancake' Heuristic function for the
     arbitrary-pancake domain.
 
@@ -221,6 +287,7 @@ def largest_pancake_heuristic_bw(state, goal, degradation, problem):
         degradation: An integer between 0 and 10 inclusive.
         problem: A namedtuple instance representing a arbitrary-pancake
             problem.
+        parent: Unused.
 
     Returns:
         A non-negative integer value for the heuristic value of state.
@@ -228,7 +295,7 @@ def largest_pancake_heuristic_bw(state, goal, degradation, problem):
     return largest_pancake_heuristic_fw(state, goal)
 
 
-def zero_heuristic(state, goal, degradation, problem):
+def zero_heuristic(state, goal, degradation, problem, parent=None):
     """Zero heuristic function.
 
     Args:
@@ -236,6 +303,7 @@ def zero_heuristic(state, goal, degradation, problem):
         goal: A state of arbitrary-pancake domain.
         degradation: Unused.
         problem: Unused.
+        parent: Unused.
 
     Returns:
         Integer value 0
@@ -243,9 +311,14 @@ def zero_heuristic(state, goal, degradation, problem):
     return 0
 
 
+pdb_heuristic = pdb.PDBHeuristic(flip_cost, name='arbitrary_pancake')
+
 heuristics = {"zero": (zero_heuristic,
                        zero_heuristic,
                        zero_heuristic),
               "largest_pancake": (largest_pancake_heuristic_fw,
                                   largest_pancake_heuristic_fw,
-                                  largest_pancake_heuristic_bw)}
+                                  largest_pancake_heuristic_bw),
+              "pdb": (pdb_heuristic,
+                      pdb_heuristic,
+                      pdb_heuristic)}
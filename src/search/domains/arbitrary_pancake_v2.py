@@ -11,10 +11,12 @@ Typical use:
 """
 
 from collections import namedtuple
-import math
 import random
 
-from src.search.utils.datastructures import Problem
+import numpy as np
+
+from src.search.utils.datastructures import LRUCache, Problem
+from src.search.utils.helpers import Heuristic, pancake, pdb
 
 
 #Problem = namedtuple('Problem', 'initial goal epsilon')
@@ -31,6 +33,8 @@ class State:
         n_successors: Number of successors of the state.
         successors_list: Lazily-calculated list of (state, cost)
             tuples, as the successors of self.
+        flip: Index of the flip giving the state from its parent, or
+            None if the state is interned or has no parent.
     """
 
     def __init__(self, state):
@@ -38,13 +42,16 @@ class State:
         self.state = state
         self.n_successors = len(self.state) - 2
         self.successors_list = None
+        self.flip = None
 
     def successors(self, problem):
         """Get successors of self, sorted by cost.
 
         Lazily calculates the successors. If function hasn't been
         called before, successors are calculated and stored.
-        If stored list exists, it is simply retrieved.
+        If stored list exists, it is simply retrieved. If the problem
+        has a successor cache, successors are stored there rather
+        than on the state, and may be evicted and recalculated.
 
         Args:
             problem: namedtuple object as created in parse_problem().
@@ -52,16 +59,31 @@ class State:
         Returns:
             A sorted list of the successors of self.
         """
+        cache = problem.successor_cache
+        if cache is not None:
+            successors = cache.get(self)
+            if successors is None:
+                successors = self._successors(problem)
+                cache.put(self, successors)
+            return successors
         if self.successors_list is None:
-            self.successors_list = []
-            for i in range(len(self.state) - 2, 0, -1):
-                first = [self.state[j] for j in range(i)]
-                second = [self.state[j] for j in range(len(self.state)-1, i-1, -1)]
-                new_state = State(tuple(first + second))
-                self.successors_list.append((new_state, cost(self, new_state, problem)))
-            self.successors_list = sorted(self.successors_list, key=lambda x: x[1])
+            self.successors_list = self._successors(problem)
         return self.successors_list
 
+    def _successors(self, problem):
+        """Calculates the successors of self, as a list of
+        (state, cost) tuples sorted by cost.
+
+        Args:
+            problem: namedtuple object as created in parse_problem().
+        """
+        successors = []
+        s = self.state
+        for i, child in reversed(pancake.flips(s)):
+            new_state = pancake.intern_state(type(self)(child), problem, flip=i)
+            successors.append((new_state, flip_cost(s, i)))
+        return sorted(successors, key=lambda x: x[1])
+
     def __hash__(self):
         return hash(self.state)
 
@@ -69,10 +91,20 @@ class State:
         return f'State(state={self.state})'
 
     def __eq__(self, other):
-        return self.state == other.state
+        return self is other or self.state == other.state
+
+
+class PackedState(pancake.PackedStateMixin, State):
+    """State class for the arbitrary-cost-v2 pancake domain, holding the stack
+    packed into a single int. See pancake.PackedStateMixin.
+    """
+
 
+encodings = {'tuple': State,
+             'packed': PackedState}
 
-def parse_problem(problem_str):
+
+def parse_problem(problem_str, encoding='tuple', intern=False, successor_cache=None):
     """Create namedtuple instance of specified problem.
 
     Creates a namedtuple instance containing various information about
@@ -88,15 +120,28 @@ def parse_problem(problem_str):
 
                 A stack of five pancakes, with '1' being the smallest,
                 5 the largest, and 6 the base.
+        encoding: Name of the State class to use, one of 'tuple'
+            and 'packed' (see encodings).
+        intern: If True, the problem is given an intern table, so
+            that each distinct state is created once.
+        successor_cache: If given, the greatest number of states
+            whose successors are held in the problem's LRU successor
+            cache. Otherwise each state holds its own successors.
 
     Returns:
         A namedtuple containing problem information.
     """
+    if encoding not in encodings:
+        raise Exception(f'Unknown state encoding: {encoding}. Options are {list(encodings)}')
+    state_type = encodings[encoding]
     initial_tuple = tuple(map(int, problem_str.split(' ')))
     goal_tuple = tuple(range(len(initial_tuple), 0, -1))
-    problem = Problem(initial=State(initial_tuple),
-                      goal=State(goal_tuple),
-                      epsilon=1)
+    initial, goal = state_type(initial_tuple), state_type(goal_tuple)
+    problem = Problem(initial=initial,
+                      goal=goal,
+                      epsilon=1,
+                      intern={initial: initial, goal: goal} if intern else None,
+                      successor_cache=LRUCache(successor_cache) if successor_cache else None)
     return problem
 
 
@@ -118,11 +163,15 @@ def generate_problems(config):
             problems.
     """
     problems = []
+    encoding = config.settings.get('encoding', 'tuple')
+    intern = config.settings.get('intern', False)
+    successor_cache = config.settings.get('successor_cache')
     if config.settings['precompiled']:
         for file_name in config.settings['precompiled']:
             with open(file_name, 'r') as f:
                 for line in f:
-                    problems.append(parse_problem(line))
+                    problems.append(parse_problem(line, encoding=encoding, intern=intern,
+                                                  successor_cache=successor_cache))
     else:
         try:
             n_problems = config.settings['n_problems']
@@ -134,7 +183,8 @@ def generate_problems(config):
             x = [i for i in range(1, param)]
             random.shuffle(x)
             problem_str = ' '.join(map(str, [param] + x))
-            problems.append(parse_problem(problem_str))
+            problems.append(parse_problem(problem_str, encoding=encoding, intern=intern,
+                                          successor_cache=successor_cache))
 
     return problems
 
@@ -163,65 +213,24 @@ def cost(state, other, problem):
     return state_1[i - 1]
 
 
-def _not_adjacent(p1, p2, state):
-    """Determines whether or not two pancakes are adjacent in a given
-    state.
+def flip_cost(stack, i):
+    """Returns the cost of the flip at index i, the pancake under the
+    spatula, without comparing the parent and child stacks.
 
     Args:
-        p1: First pancake.
-        p2: Second pancake.
-        state: State to check for adjacency.
-
-    Returns:
-        A boolean value.
+        stack: Parent stack, as a tuple of pancakes.
+        i: Index of the lowest pancake flipped.
     """
-    adj = True
-    for i in range(len(state) - 1):
-        pair = (state[i], state[i+1])
-        if p1 in pair and p2 in pair:
-            adj = False
-    return adj
+    return stack[i - 1]
 
 
-def min_side_heuristic_fw(state, goal, degradation, problem):
-    """Forward direction 'Min side' Heuristic function for the
-    arbitrary-pancake domain.
+# Dense ranks of states, for the 'ranked' closed-list
+rank_state = pancake.rank_state_of
+n_ranks = pancake.n_ranks_of
 
-    Heuristic is calculated as follows:
 
-        For every gap (two pancakes adjacent in a state which are
-            not adjacent in the goal state), increment the heuristic
-            value by the minimum of the two pancakes.
-
-    Heuristic can be degraded by specifying an integer
-    value 0 <= x <= 10, where 0 is perfect heuristic, and 10 is blind.
-    Degradation involves ignoring the top (degradation / 10)% of the
-    pancakes when calculating heuristic.
-
-    Args:
-        state: A state of arbitrary-pancake domain.
-        goal: A state of arbitrary-pancake domain.
-        degradation: An integer between 0 and 10 inclusive.
-        problem: A namedtuple instance representing a arbitrary-pancake
-            problem.
-
-    Returns:
-        A non-negative integer value for the heuristic value of state.
-    """
-    s, g = state.state, goal.state
-    if s == g:
-        return 0
-    h = 0
-    stop_condition = (len(g)-1) - math.floor((degradation / 10) * len(g))
-    for i in range(stop_condition):
-        if _not_adjacent(s[i], s[i+1], g):
-            h += min(s[i], s[i+1])
-    return h
-
-
-def min_side_heuristic_bw(state, goal, degradation, problem):
-    """Backward direction 'Min side' Heuristic function for the
-    arbitrary-pancake domain.
+class MinSideHeuristic(Heuristic):
+    """'Min side' Heuristic for the arbitrary-pancake domain.
 
     Heuristic is calculated as follows:
 
@@ -229,25 +238,105 @@ def min_side_heuristic_bw(state, goal, degradation, problem):
             not adjacent in the goal state), increment the heuristic
             value by the minimum of the two pancakes.
 
+    The reverse heuristic instead counts the pairs adjacent in the goal
+    which are not adjacent in the state, as used for the backward
+    direction.
+
     Heuristic can be degraded by specifying an integer
     value 0 <= x <= 10, where 0 is perfect heuristic, and 10 is blind.
     Degradation involves ignoring the top (degradation / 10)% of the
     pancakes when calculating heuristic.
 
-    Args:
-        state: A state of arbitrary-pancake domain.
-        goal: A state of arbitrary-pancake domain.
-        degradation: An integer between 0 and 10 inclusive.
-        problem: A namedtuple instance representing a arbitrary-pancake
-            problem.
+    The position of each pancake in the goal is tabled once per
+    problem. If the node from which a state was generated is given, the
+    value is updated from the parent's, as a flip changes only one
+    adjacency. The batch form counts the gaps of many states at once,
+    and the profile form gives the gaps below every cutoff.
 
-    Returns:
-        A non-negative integer value for the heuristic value of state.
+    Attributes:
+        reverse: Whether the pairs of the goal are counted, rather than
+            those of the state.
     """
-    return min_side_heuristic_fw(goal, state, degradation, problem)
 
+    def __init__(self, reverse=False):
+        """Initializes MinSideHeuristic with no tables."""
+        super().__init__()
+        self.reverse = reverse
+
+    def precompute(self, problem, goal):
+        """Returns the positions of the pancakes in the goal."""
+        return pancake.positions(goal.state)
+
+    def bind(self, goal_pos, degradation, goal, problem):
+        """Returns the callable weighing the gaps below the cutoff of degradation."""
+        g = goal.state
+        stop_condition = pancake.stop_index(len(g), degradation)
+        if self.reverse:
+            return self._bind_reverse(goal_pos, g, stop_condition)
+        gaps, gaps_after_flip, flip_index = pancake.gaps, pancake.gaps_after_flip, pancake.flip_index
+
+        def min_side_heuristic(state, parent=None):
+            if parent is not None:
+                stack = parent.state.state
+                return gaps_after_flip(parent.h, stack, state.state, flip_index(stack, state), goal_pos,
+                                       stop_condition, weight=min)
+            return gaps(state.state, goal_pos, stop_condition, weight=min)
+        return min_side_heuristic
+
+    def _bind_reverse(self, goal_pos, g, stop_condition):
+        """Returns the callable for the reverse heuristic, which checks
+        the goal's pairs, tabled with their weights, for adjacency in
+        the state."""
+        pairs = tuple((g[k], g[k + 1], min(g[k], g[k + 1])) for k in range(stop_condition))
+        positions, goal_gaps_after_flip = pancake.positions, pancake.goal_gaps_after_flip
+        flip_index = pancake.flip_index
+
+        def min_side_heuristic_reverse(state, parent=None):
+            if parent is not None:
+                stack = parent.state.state
+                return goal_gaps_after_flip(parent.h, stack, state.state, flip_index(stack, state), goal_pos,
+                                            stop_condition, weight=min)
+            pos = positions(state.state)
+            return sum(w for a, b, w in pairs if abs(pos[a] - pos[b]) != 1)
+        return min_side_heuristic_reverse
+
+    def bind_batch(self, goal_pos, degradation, goal, problem):
+        """Returns the vectorized form of bind(), for a list of states."""
+        g = goal.state
+        stop_condition = pancake.stop_index(len(g), degradation)
+        if self.reverse:
+            g = np.asarray(g)
+
+            def min_side_heuristic_batch(states):
+                stacks = np.array([state.state for state in states])
+                return pancake.batch_goal_gaps(stacks, g, stop_condition, weight=np.minimum).tolist()
+        else:
+            goal_pos = np.asarray(goal_pos)
+
+            def min_side_heuristic_batch(states):
+                stacks = np.array([state.state for state in states])
+                return pancake.batch_gaps(stacks, goal_pos, stop_condition, weight=np.minimum).tolist()
+        return min_side_heuristic_batch
+
+    def bind_profile(self, goal_pos, goal, problem):
+        """Returns the callables giving the weighted gaps of a state below every cutoff, and the cutoff of a
+        degradation."""
+        g = goal.state
+        stop_index = pancake.stop_index
+
+        def index(degradation):
+            return max(stop_index(len(g), degradation), 0)
+        if self.reverse:
+            goal_gap_profile = pancake.goal_gap_profile
+            return lambda state: goal_gap_profile(state.state, g, weight=min), index
+        gap_profile = pancake.gap_profile
+        return lambda state: gap_profile(state.state, goal_pos, weight=min), index
 
-def zero_heuristic(state, goal, degradation, problem):
+    def __repr__(self):
+        return f'MinSideHeuristic(reverse={self.reverse})'
+
+
+def zero_heuristic(state, goal, degradation, problem, parent=None):
     """Zero heuristic function.
 
     Args:
@@ -255,6 +344,7 @@ def zero_heuristic(state, goal, degradation, problem):
         goal: A state of unit-pancake domain.
         degradation: Unused.
         problem: Unused.
+        parent: Unused.
 
     Returns:
         Integer value 0
@@ -262,5 +352,11 @@ def zero_heuristic(state, goal, degradation, problem):
     return 0
 
 
+min_side_heuristic_fw = MinSideHeuristic()
+min_side_heuristic_bw = MinSideHeuristic(reverse=True)
+
+pdb_heuristic = pdb.PDBHeuristic(flip_cost, name='arbitrary_pancake_v2', positional=False)
+
 heuristics = {"zero": (zero_heuristic, zero_heuristic, zero_heuristic),
-              "min_side": (min_side_heuristic_fw, min_side_heuristic_fw, min_side_heuristic_bw)}
\ No newline at end of file
+              "min_side": (min_side_heuristic_fw, min_side_heuristic_fw, min_side_heuristic_bw),
+              "pdb": (pdb_heuristic, pdb_heuristic, pdb_heuristic)}
@@ -138,7 +138,7 @@ def cost(state, other, problem):
     raise NotImplementedError
 
 
-def zero_heuristic(state, goal, degradation, problem):
+def zero_heuristic(state, goal, degradation, problem, parent=None):
     """Zero heuristic function.
 
     Args:
@@ -146,6 +146,7 @@ def zero_heuristic(state, goal, degradation, problem):
         goal: A state of {domain name} domain.
         degradation: Unused.
         problem: Unused.
+        parent: Unused.
 
     Returns:
         Integer value 0
@@ -154,6 +155,8 @@ def zero_heuristic(state, goal, degradation, problem):
 
 
 # format: "heuristic_name": (forward_h, forward_h, backward_h)
+# Each h is a heuristic function as above, or a helpers.Heuristic whose prepare() builds
+# goal-derived tables once per problem
 heuristics = {"zero": (zero_heuristic,
                        zero_heuristic,
                        zero_heuristic)}
@@ -8,11 +8,13 @@ Typical use:
 """
 
 from collections import namedtuple
-from itertools import product
 import math
 import random
 
-from src.search.utils.datastructures import Problem
+import numpy as np
+
+from src.search.utils.datastructures import LRUCache, Problem
+from src.search.utils.helpers import Heuristic
 
 Point = namedtuple('Point', 'x y')
 City = namedtuple('City', 'point visited')
@@ -52,7 +54,9 @@ class State:
 
         Lazily calculates the successors. If function hasn't been
         called before, successors are calculated and stored.
-        If stored list exists, it is simply retrieved.
+        If stored list exists, it is simply retrieved. If the problem
+        has a successor cache, successors are stored there rather
+        than on the state, and may be evicted and recalculated.
 
         Successors of a given state are the configurations of cities
         which directly follow from the current state. The current city,
@@ -65,30 +69,65 @@ class State:
         Returns:
             A sorted list of the successors of self.
         """
+        cache = problem.successor_cache
+        if cache is not None:
+            successors = cache.get((self, self.direction))
+            if successors is None:
+                successors = self._successors(problem)
+                cache.put((self, self.direction), successors)
+            return successors
         if self.successors_list is None:
-            self.successors_list = []
-            for idx, city in enumerate(self.state):
-                if city.visited == 0:
-                    current_city = city
-                    current_city_idx = idx
-                    break
-            else:
-                raise IndexError('No city found with visited == 0')
-
-            """ Get successor states, costs and append as (state, cost) to self.successors_list """
-            for idx, city in enumerate(self.state):
-                if city.visited == -1*self.direction:
-                    new_current_city_idx = idx
-                    new_state = list(self.state)
-                    new_state[current_city_idx] = new_state[current_city_idx]._replace(visited=self.direction)
-                    new_state[new_current_city_idx] = new_state[new_current_city_idx]._replace(visited=0)
-                    new_state = State(tuple(new_state), self.direction, n_successors=self.n_successors-1)
-                    c = _dist(current_city.point, city.point)
-                    self.successors_list.append((new_state, c))
-
-            self.successors_list = sorted(self.successors_list, key=lambda x: x[1])
+            self.successors_list = self._successors(problem)
         return self.successors_list
 
+    def _successors(self, problem):
+        """Calculates the successors of self, as a list of
+        (state, cost) tuples sorted by cost.
+
+        Args:
+            problem: namedtuple object as created in parse_problem().
+        """
+        successors = []
+        distances = problem.statics[1]
+        n_cities = len(distances)
+        for idx, city in enumerate(self.state):
+            if city.visited == 0:
+                current_city_idx = idx
+                break
+        else:
+            raise IndexError('No city found with visited == 0')
+
+        """ Get successor states, costs and append as (state, cost) to successors """
+        for idx, city in enumerate(self.state):
+            if city.visited == -1*self.direction:
+                new_current_city_idx = idx
+                new_state = list(self.state)
+                new_state[current_city_idx] = new_state[current_city_idx]._replace(visited=self.direction)
+                new_state[new_current_city_idx] = new_state[new_current_city_idx]._replace(visited=0)
+                new_state = State(tuple(new_state), self.direction, n_successors=self.n_successors-1)
+                c = distances.item(current_city_idx % n_cities, idx % n_cities)
+                successors.append((new_state, c))
+
+        return sorted(successors, key=lambda x: x[1])
+
+    def positions(self, label):
+        """Returns an iterable of the indices of the cities of self
+        labelled label."""
+        return (idx for idx, city in enumerate(self.state) if city.visited == label)
+
+    def labels(self):
+        """Returns a tuple of the labels of the cities of self."""
+        return tuple(city.visited for city in self.state)
+
+    def label_mask(self, label):
+        """Returns a bitmask of the indices of the cities of self
+        labelled label."""
+        mask = 0
+        for idx, city in enumerate(self.state):
+            if city.visited == label:
+                mask |= 1 << idx
+        return mask
+
     def __hash__(self):
         return hash(self.state)
 
@@ -99,15 +138,133 @@ class State:
         return self.state == other.state
 
 
-def parse_problem(problem_str):
+class BitmaskState:
+    """State class for the TSP domain, holding the cities labelled 1 as
+    a bitmask, and the index of the current city (labelled 0). All other
+    cities are labelled -1.
+
+    Indices are those of the cities in a State: city k % n of n cities,
+    index n being the initial city again. The labels of a state are the
+    same in either direction, so that forward and backward states are
+    equal if they describe the same tour prefix and suffix.
+
+    Attributes:
+        mask: Bitmask of the indices of the cities labelled 1.
+        city: Index of the current city.
+        direction: Direction in which the state is expanded.
+        n_positions: Number of indices, one more than the number of
+            cities.
+        key: mask * n_positions + city, a dense index of the state.
+        n_successors: Number of successors of the state.
+        successors_list: Lazily-calculated list of (state, cost)
+            tuples, as the successors of self.
+    """
+
+    __slots__ = ('mask', 'city', 'direction', 'n_positions', 'key', 'n_successors', 'successors_list')
+
+    def __init__(self, mask, city, direction, n_positions):
+        """Initializes BitmaskState object."""
+        self.mask = mask
+        self.city = city
+        self.direction = direction
+        self.n_positions = n_positions
+        self.key = mask * n_positions + city
+        n_labelled_1 = bin(mask).count('1')
+        self.n_successors = n_labelled_1 if direction == -1 else n_positions - 1 - n_labelled_1
+        self.successors_list = None
+
+    @property
+    def state(self):
+        """The (mask, city) pair describing the state."""
+        return self.mask, self.city
+
+    successors = State.successors
+
+    def _successors(self, problem):
+        """Calculates the successors of self, as a list of
+        (state, cost) tuples sorted by cost.
+
+        Going forward, the current city is added to the mask and each
+        city labelled -1 becomes current in turn. Going backward, the
+        current city is left out of the mask, and each city of the mask
+        is removed from it and becomes current in turn.
+
+        Args:
+            problem: namedtuple object as created in parse_problem().
+        """
+        distances = problem.statics[1]
+        n_cities, n_positions, direction = len(distances), self.n_positions, self.direction
+        row = self.city % n_cities
+        if direction == 1:
+            mask = self.mask | (1 << self.city)
+            candidates = ((1 << n_positions) - 1) & ~mask
+        else:
+            mask = candidates = self.mask
+        successors = []
+        while candidates:
+            bit = candidates & -candidates
+            candidates ^= bit
+            idx = bit.bit_length() - 1
+            child_mask = mask if direction == 1 else mask & ~bit
+            successors.append((BitmaskState(child_mask, idx, direction, n_positions),
+                               distances.item(row, idx % n_cities)))
+        return sorted(successors, key=lambda x: x[1])
+
+    def positions(self, label):
+        """Returns an iterable of the indices of the cities of self
+        labelled label."""
+        if label == 0:
+            return (self.city,)
+        mask = self.mask if label == 1 else ((1 << self.n_positions) - 1) & ~self.mask & ~(1 << self.city)
+        return (idx for idx in range(self.n_positions) if mask >> idx & 1)
+
+    def labels(self):
+        """Returns a tuple of the labels of the cities of self."""
+        return tuple(0 if idx == self.city else (1 if self.mask >> idx & 1 else -1)
+                     for idx in range(self.n_positions))
+
+    def label_mask(self, label):
+        """Returns a bitmask of the indices of the cities of self
+        labelled label."""
+        if label == 0:
+            return 1 << self.city
+        if label == 1:
+            return self.mask
+        return ((1 << self.n_positions) - 1) & ~self.mask & ~(1 << self.city)
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f'BitmaskState(mask={self.mask:#b}, city={self.city})'
+
+    def __eq__(self, other):
+        return self is other or self.key == other.key
+
+
+encodings = {'cities': State,
+             'bitmask': BitmaskState}
+
+
+def parse_problem(problem_str, encoding='cities', successor_cache=None):
     """Create namedtuple instance of specified problem.
 
     Creates a namedtuple instance containing various information about
     the problem, including initial state, goal state, and epsilon
     (minimum operator cost).
 
+    The statics of the problem are the list of cities, the NumPy matrix
+    of integer distances between them, and for each city a tuple of the
+    other cities sorted by distance, all indexed by city number. The
+    city at index k of a state is city k % n of n cities.
+
     Args:
         problem_str: A string representation of the problem, { . . . }
+        encoding: Name of the State class to use, one of 'cities'
+            and 'bitmask' (see encodings).
+        successor_cache: If given, the greatest number of states
+            whose successors are held in the problem's LRU successor
+            cache. Otherwise each state holds its own successors.
 
     Returns:
         A namedtuple containing problem information.
@@ -123,11 +280,23 @@ def parse_problem(problem_str):
                  + tuple(City(cities[i], 1) for i in range(1, len(cities))) \
                  + (City(cities[0], 0),)
 
-    epsilon = _get_epsilon(cities)
-    problem = Problem(initial=State(initial_tuple, direction=1, n_successors=len(cities)-1),
-                      goal=State(goal_tuple, direction=-1, n_successors=len(cities)-1),
+    distances = _distance_matrix(cities)
+    neighbours = tuple(tuple(j for j in np.argsort(row, kind='stable').tolist() if j != i)
+                       for i, row in enumerate(distances))
+    epsilon = _get_epsilon(distances)
+    if encoding == 'cities':
+        initial = State(initial_tuple, direction=1, n_successors=len(cities)-1)
+        goal = State(goal_tuple, direction=-1, n_successors=len(cities)-1)
+    elif encoding == 'bitmask':
+        initial = BitmaskState(0, 0, direction=1, n_positions=len(cities)+1)
+        goal = BitmaskState((1 << len(cities)) - 1, len(cities), direction=-1, n_positions=len(cities)+1)
+    else:
+        raise Exception(f'Unknown state encoding: {encoding}. Options are {list(encodings)}')
+    problem = Problem(initial=initial,
+                      goal=goal,
                       epsilon=epsilon,
-                      statics=(cities,))
+                      statics=(cities, distances, neighbours),
+                      successor_cache=LRUCache(successor_cache) if successor_cache else None)
     return problem
 
 
@@ -149,11 +318,13 @@ def generate_problems(config):
             problems.
     """
     problems = []
+    encoding = config.settings.get('encoding', 'cities')
+    successor_cache = config.settings.get('successor_cache')
     if config.settings['precompiled']:
         for file_name in config.settings['precompiled']:
             with open(file_name, 'r') as f:
                 problem_str = ','.join(line.strip('\n') for line in f.readlines())
-                problems.append(parse_problem(problem_str))
+                problems.append(parse_problem(problem_str, encoding=encoding, successor_cache=successor_cache))
     else:
         try:
             n_problems = config.settings['n_problems']
@@ -166,7 +337,7 @@ def generate_problems(config):
             problem_str = ','.join([f'{round(random.uniform(0, 1000), ndigits=3)} '
                                     f'{round(random.uniform(0, 1000), ndigits=3)}'
                                     for i in range(param)])
-            problems.append(parse_problem(problem_str))
+            problems.append(parse_problem(problem_str, encoding=encoding, successor_cache=successor_cache))
     return problems
 
 
@@ -184,102 +355,413 @@ def cost(state, other, problem):
     Returns:
         The integer cost of moving from state to other.
     """
-    for i, x in enumerate(state.state):
-        if x.visited == 0:
-            for j, y in enumerate(other.state):
-                if y.visited == 0:
-                    return _dist(x.point, y.point)
+    distances = problem.statics[1]
+    n_cities = len(distances)
+    i, = state.positions(0)
+    j, = other.positions(0)
+    return distances.item(i % n_cities, j % n_cities)
+
+
+def state_index(state):
+    """Returns the dense index of a bitmask state, for use as an index
+    into array-based state tables.
+
+    Args:
+        state: A BitmaskState of the TSP domain.
+
+    Returns:
+        An integer in [0, n_state_indices(state)).
+    """
+    return state.key
+
+
+def n_state_indices(state):
+    """Returns the number of dense indices of states with as many
+    cities as state, or None if the state's encoding has no dense index.
+
+    Args:
+        state: A state of the TSP domain.
+    """
+    if not isinstance(state, BitmaskState):
+        return None
+    return (1 << state.n_positions) * state.n_positions
 
-def _get_epsilon(cities):
-    """Returns the minimum edge weight between any two cities in a
-    provided list.
+
+def _get_epsilon(distances):
+    """Returns the minimum edge weight between any two distinct cities.
 
     Args:
-        cities: A list of City objects.
+        distances: The matrix of distances between cities.
 
     Returns:
         An integer value for the smallest edge cost.
     """
-    return min(_dist(city_1, city_2) for city_1, city_2 in product(cities, cities) if city_1 != city_2)
+    return int(distances[distances > 0].min())
+
 
-def _dist(city_1: City, city_2: City):
-    """Gives the euclidean distance between two cities, rounded up.
+def _distance_matrix(cities):
+    """Gives the euclidean distances between every pair of cities,
+    rounded up.
 
     Args:
-        city_1, city_2: An object of type City.
+        cities: A list of Point objects.
 
     Returns:
-        Integer value.
+        A NumPy integer array of shape (n, n).
     """
-    out = math.ceil(math.sqrt((city_1.x - city_2.x)**2 + (city_1.y - city_2.y)**2))
-    return out
+    points = np.array(cities, dtype=float)
+    diff = points[:, None, :] - points[None, :, :]
+    return np.ceil(np.sqrt((diff ** 2).sum(axis=2))).astype(np.int64)
 
 
-def _min_edge_in(city, cities):
-    return min(_dist(city, other) for other in cities if other != city)
+def _min_edge_in(city, distances, neighbours):
+    """Gives the cheapest edge into a city from another city at a
+    different point.
 
+    Args:
+        city: Number of the city.
+        distances: The matrix of distances between cities.
+        neighbours: The other cities of each city, sorted by distance.
+    """
+    return next(d for d in (distances.item(city, other) for other in neighbours[city]) if d > 0)
 
-def _all_edges_between(cities):
-    edges = []
-    for i in range(len(cities) - 1):
-        for j in range(i + 1, len(cities)):
-            edges.append((_dist(cities[i].point, cities[j].point), cities[i].point, cities[j].point))
-    return edges
 
+def _mst(mst_cities, distances):
+    """Gives the weight of a minimum spanning tree of a set of cities,
+    by Prim's algorithm over the rows of the distance matrix.
 
-def _mst(mst_cities):
-    edges = sorted(_all_edges_between(mst_cities), key=lambda x: x[0])
-    mst_set = set((city.point,) for city in mst_cities)
+    Args:
+        mst_cities: A list of distinct city numbers.
+        distances: The matrix of distances between cities.
+
+    Returns:
+        An integer value for the weight of the tree.
+    """
+    if len(mst_cities) < 2:
+        return 0
+    sub = distances[np.ix_(mst_cities, mst_cities)]
+    unreached = np.iinfo(sub.dtype).max
+    in_tree = np.zeros(len(mst_cities), dtype=bool)
+    in_tree[0] = True
+    # Cheapest edge from the tree into each city, unreached for cities in the tree
+    cheapest = sub[0].copy()
+    cheapest[0] = unreached
     mst_weight = 0
-    for edgeweight, city_1, city_2 in edges:
-        for s in mst_set:
-            if city_1 in s:
-                s_1 = s
-            if city_2 in s:
-                s_2 = s
-        if s_1 is not s_2:
-            mst_weight += edgeweight
-            mst_set.remove(s_1)
-            mst_set.remove(s_2)
-            mst_set.add(s_1 + s_2)
-        if len(mst_set) == 1:
-            break
+    for _ in range(len(mst_cities) - 1):
+        j = int(cheapest.argmin())
+        mst_weight += int(cheapest[j])
+        in_tree[j] = True
+        np.minimum(cheapest, sub[j], out=cheapest)
+        cheapest[in_tree] = unreached
     return mst_weight
 
 
-def edges_in_heuristic_fw(state, goal, degradation, problem):
-    direction = -1
-    h = 0
-    for city, visited in state.state:
-        if visited == direction:
-            h += _min_edge_in(city, cities=problem.statics[0])
-    return h
+def _spanned_mask(state, direction, n_cities):
+    """Returns the bitmask of the cities spanned by the heuristics of a
+    direction: those labelled direction in state, the current city and
+    the initial city.
+
+    Args:
+        state: A State or BitmaskState.
+        direction: Label of the cities spanned, -1 for the forward
+            direction and 1 for the backward.
+        n_cities: Number of cities of the problem.
+    """
+    # Fold the initial city's second index onto the first, and span the initial city always
+    mask = state.label_mask(direction) | state.label_mask(0)
+    return (mask & ((1 << n_cities) - 1)) | (mask >> n_cities) | 1
+
+
+class EdgesInHeuristic(Heuristic):
+    """'Edges in' Heuristic for the TSP domain.
+
+    Heuristic is the sum, over the cities still to be visited in a
+    direction, of the cheapest edge into each city. The cheapest edge
+    into every city is tabled once per problem. The batch form sums the
+    tabled edges of many states at once, masked by their labels.
+
+    Attributes:
+        direction: Label of the cities counted, -1 for the forward
+            direction and 1 for the backward.
+    """
+
+    def __init__(self, direction):
+        """Initializes EdgesInHeuristic with no tables."""
+        super().__init__()
+        self.direction = direction
+
+    def precompute(self, problem, goal):
+        """Returns the least weight of an edge into each city."""
+        _, distances, neighbours = problem.statics
+        # A state lists the cities in the order of the problem, with the initial city again at the end
+        return [_min_edge_in(k % len(distances), distances, neighbours) for k in range(len(distances) + 1)]
+
+    def bind(self, min_edge_in, degradation, goal, problem):
+        """Returns the callable summing the least edges into the unvisited cities."""
+        direction = self.direction
+
+        def edges_in_heuristic(state, parent=None):
+            return sum(min_edge_in[idx] for idx in state.positions(direction))
+        return edges_in_heuristic
+
+    def bind_batch(self, min_edge_in, degradation, goal, problem):
+        """Returns the vectorized form of bind(), for a list of states."""
+        direction = self.direction
+        weights = np.array(min_edge_in)
+
+        def edges_in_heuristic_batch(states):
+            visited = np.array([state.labels() for state in states])
+            return ((visited == direction) @ weights).tolist()
+        return edges_in_heuristic_batch
+
+    def __repr__(self):
+        return f'EdgesInHeuristic(direction={self.direction})'
+
+
+edges_in_heuristic_fw = EdgesInHeuristic(direction=-1)
+edges_in_heuristic_bw = EdgesInHeuristic(direction=1)
+
 
+class MSTHeuristic(Heuristic):
+    """'Minimum spanning tree' Heuristic for the TSP domain.
 
-def edges_in_heuristic_bw(state, goal, degradation, problem):
-    direction = 1
-    h = 0
-    for city, visited in state.state:
-        if visited == direction:
-            h += _min_edge_in(city, cities=problem.statics[0])
-    return h
+    Heuristic is the weight of a minimum spanning tree of the cities
+    still to be visited in a direction, the current city and the initial
+    city. Many states share the same cities still to be visited, so the
+    weights are memoized in a per-problem LRU cache keyed by the bitmask
+    of the cities spanned, whose hits and misses are reported for each
+    search.
 
+    Attributes:
+        direction: Label of the cities spanned, -1 for the forward
+            direction and 1 for the backward.
+        cache_size: Greatest number of weights held in the cache, or
+            None for no limit.
+        cache: The LRUCache of the problem last prepared, or None.
+    """
+
+    settings_args = {'mst_cache_size': 'cache_size'}
+
+    def __init__(self, direction, cache_size=100000):
+        """Initializes MSTHeuristic with no tables."""
+        super().__init__()
+        self.direction = direction
+        self.cache_size = cache_size
+        self.cache = None
+
+    def precompute(self, problem, goal):
+        """Returns an empty cache of spanning tree weights, keyed by the cities spanned."""
+        return LRUCache(self.cache_size)
+
+    def bind(self, cache, degradation, goal, problem):
+        """Returns the callable giving the weight of the spanning tree of the unvisited cities."""
+        distances = problem.statics[1]
+        n_cities = len(distances)
+        direction = self.direction
+        cache.reset_stats()
+        self.cache = cache
+
+        def mst_heuristic(state, parent=None):
+            mask = _spanned_mask(state, direction, n_cities)
+            weight = cache.get(mask)
+            if weight is None:
+                weight = _mst([city for city in range(n_cities) if mask >> city & 1], distances)
+                cache.put(mask, weight)
+            return weight
+        return mst_heuristic
+
+    def stats(self, goal=None):
+        """Returns the lookup and eviction counters of the cache of
+        goal, by default the cache last prepared."""
+        cache = self.cache if goal is None else self.tables.get(id(goal))
+        return cache.stats() if cache is not None else {}
 
-def mst_heuristic_fw(state, goal, degradation, problem):
-    direction = -1
-    mst_cities = [city for city in state.state if city.visited in [direction, 0]]
-    mst_cities.append(state.state[0])
-    return _mst(mst_cities)
+    def __repr__(self):
+        return f'MSTHeuristic(direction={self.direction}, cache_size={self.cache_size})'
+
+
+mst_heuristic_fw = MSTHeuristic(direction=-1)
+mst_heuristic_bw = MSTHeuristic(direction=1)
+
+
+def _spanning_tree(weights):
+    """Gives a minimum spanning tree of a complete graph, by Prim's
+    algorithm.
+
+    Args:
+        weights: A square float array of edge weights.
+
+    Returns:
+        A (weight, degrees) tuple of the tree's weight and the degree of
+        each vertex in it.
+    """
+    k = len(weights)
+    degrees = np.zeros(k, dtype=np.int64)
+    in_tree = np.zeros(k, dtype=bool)
+    in_tree[0] = True
+    cheapest = weights[0].copy()
+    cheapest[0] = np.inf
+    nearest = np.zeros(k, dtype=np.intp)
+    tree_weight = 0.0
+    for _ in range(k - 1):
+        j = int(cheapest.argmin())
+        tree_weight += cheapest[j]
+        degrees[j] += 1
+        degrees[nearest[j]] += 1
+        in_tree[j] = True
+        closer = weights[j] < cheapest
+        cheapest[closer] = weights[j][closer]
+        nearest[closer] = j
+        cheapest[in_tree] = np.inf
+    return tree_weight, degrees
+
+
+def _held_karp(sub, start, multipliers, iterations):
+    """Gives the Held-Karp lower bound on the cheapest path from city
+    start to city 0 through every city of a subproblem, by subgradient
+    ascent on the multipliers of the cities.
+
+    A path is a spanning tree in which its ends have degree 1 and every
+    other city degree 2. Relaxing the degrees with multipliers pi, the
+    weight of a minimum spanning tree under edge weights
+    d(i, j) + pi[i] + pi[j], less the sum of pi times the degrees, is a
+    lower bound for any pi. If start is city 0 the path is a tour, and
+    the tree is a 1-tree: a spanning tree of the other cities and the
+    two cheapest edges of city 0.
+
+    Args:
+        sub: Square array of the distances between the cities of the
+            subproblem, city 0 first.
+        start: Index in sub of the current city.
+        multipliers: Float array of the initial multipliers.
+        iterations: Greatest number of subgradient steps.
+
+    Returns:
+        A (bound, multipliers, steps) tuple of the greatest bound found,
+        the multipliers giving it and the number of subgradient steps
+        taken, fewer than iterations if the tree found is a path.
+    """
+    k = len(sub)
+    if k == 1:
+        return 0.0, multipliers, 0
+    if k == 2:
+        return float(sub[0, 1] * (2 if start == 0 else 1)), multipliers, 0
+    target = np.full(k, 2)
+    if start != 0:
+        target[[0, start]] = 1
+    rest = np.arange(1, k)
+    pi = multipliers
+    best, best_pi = -np.inf, pi
+    scale = sub.max() / k
+    steps = 0
+    for iteration in range(iterations + 1):
+        weights = sub + pi[:, None] + pi[None, :]
+        if start == 0:
+            tree_weight, rest_degrees = _spanning_tree(weights[np.ix_(rest, rest)])
+            two = np.argpartition(weights[0, rest], 1)[:2]
+            tree_weight += weights[0, rest[two]].sum()
+            degrees = np.concatenate(([2], rest_degrees))
+            degrees[rest[two]] += 1
+        else:
+            tree_weight, degrees = _spanning_tree(weights)
+        bound = tree_weight - float(pi @ target)
+        if bound > best:
+            best, best_pi = bound, pi
+        subgradient = degrees - target
+        if iteration == iterations or not subgradient.any():
+            break
+        step = scale * 0.9 ** iteration / np.sqrt(subgradient @ subgradient)
+        pi = pi + step * subgradient
+        steps += 1
+    return best, best_pi, steps
+
+
+class HeldKarpHeuristic(Heuristic):
+    """'Held-Karp' Heuristic for the TSP domain.
+
+    Heuristic is the Held-Karp lower bound (see _held_karp) on the
+    cheapest path from the current city through the cities still to be
+    visited in a direction and back to the initial city. Each evaluation
+    runs a budget of subgradient steps, starting from the multipliers of
+    the parent's evaluation, which differs by one city. Bounds and
+    multipliers are memoized in a per-problem LRU cache keyed by the
+    cities spanned and the current city.
+
+    Attributes:
+        direction: Label of the cities spanned, -1 for the forward
+            direction and 1 for the backward.
+        iterations: Number of subgradient steps per evaluation.
+        cache_size: Greatest number of bounds held in the cache, or None
+            for no limit.
+        cache: The LRUCache of the problem last prepared, or None.
+        n_iterations: Number of subgradient steps taken since the
+            heuristic was last prepared.
+    """
+
+    settings_args = {'held_karp_iterations': 'iterations', 'held_karp_cache_size': 'cache_size'}
+
+    def __init__(self, direction, iterations=5, cache_size=100000):
+        """Initializes HeldKarpHeuristic with no tables."""
+        super().__init__()
+        self.direction = direction
+        self.iterations = iterations
+        self.cache_size = cache_size
+        self.cache = None
+        self.n_iterations = 0
+
+    def precompute(self, problem, goal):
+        """Returns an empty cache of bounds and multipliers, keyed by the cities spanned."""
+        return LRUCache(self.cache_size)
+
+    def bind(self, cache, degradation, goal, problem):
+        """Returns the callable giving the Held-Karp bound on the remaining tour."""
+        distances = problem.statics[1]
+        n_cities = len(distances)
+        direction, iterations = self.direction, self.iterations
+        cache.reset_stats()
+        self.cache, self.n_iterations = cache, 0
+
+        def key(state):
+            current, = state.positions(0)
+            return _spanned_mask(state, direction, n_cities), current % n_cities
+
+        def held_karp_heuristic(state, parent=None):
+            state_key = key(state)
+            entry = cache.get(state_key)
+            if entry is None:
+                mask, current = state_key
+                cities = [city for city in range(n_cities) if mask >> city & 1]
+                multipliers = np.zeros(n_cities)
+                parent_entry = cache.peek(key(parent.state)) if parent is not None else None
+                if parent_entry is not None:
+                    multipliers[:] = parent_entry[1]
+                bound, multipliers[cities], steps = _held_karp(distances[np.ix_(cities, cities)], cities.index(current),
+                                                               multipliers[cities], iterations)
+                self.n_iterations += steps
+                entry = max(0, math.ceil(bound - 1e-6)), multipliers
+                cache.put(state_key, entry)
+            return entry[0]
+        return held_karp_heuristic
+
+    def stats(self, goal=None):
+        """Returns the lookup and eviction counters of the cache of
+        goal, by default the cache last prepared, and the number of
+        subgradient steps."""
+        cache = self.cache if goal is None else self.tables.get(id(goal))
+        if cache is None:
+            return {}
+        return {**cache.stats(), 'iterations': self.n_iterations}
+
+    def __repr__(self):
+        return (f'HeldKarpHeuristic(direction={self.direction}, iterations={self.iterations}, '
+                f'cache_size={self.cache_size})')
 
 
-def mst_heuristic_bw(state, goal, degradation, problem):
-    direction = 1
-    mst_cities = [city for city in state.state if city.visited in [direction, 0]]
-    mst_cities.append(state.state[-1])
-    return _mst(mst_cities)
+held_karp_heuristic_fw = HeldKarpHeuristic(direction=-1)
+held_karp_heuristic_bw = HeldKarpHeuristic(direction=1)
 
 
-def zero_heuristic(state, goal, degradation, problem):
+def zero_heuristic(state, goal, degradation, problem, parent=None):
     """Zero heuristic function.
 
     Args:
@@ -287,6 +769,7 @@ def zero_heuristic(state, goal, degradation, problem):
         goal: A state of {domain name} domain.
         degradation: Unused.
         problem: Unused.
+        parent: Unused.
 
     Returns:
         Integer value 0
@@ -300,5 +783,7 @@ heuristics = {"zero": (zero_heuristic,
               "edges_in": (edges_in_heuristic_fw,
                            edges_in_heuristic_bw),
               "mst": (mst_heuristic_fw,
-                      mst_heuristic_bw)
+                      mst_heuristic_bw),
+              "held_karp": (held_karp_heuristic_fw,
+                            held_karp_heuristic_bw)
 }
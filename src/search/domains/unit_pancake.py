@@ -8,10 +8,12 @@ Typical use:
 """
 
 from collections import namedtuple
-import math
 import random
 
-from src.search.utils.datastructures import Problem
+import numpy as np
+
+from src.search.utils.datastructures import LRUCache, Problem
+from src.search.utils.helpers import Heuristic, pancake, pdb
 
 
 class State:
@@ -25,6 +27,8 @@ class State:
         n_successors: Number of successors of the state.
         successors_list: Lazily-calculated list of (state, cost)
             tuples, as the successors of self.
+        flip: Index of the flip giving the state from its parent, or
+            None if the state is interned or has no parent.
     """
 
     def __init__(self, state):
@@ -32,13 +36,16 @@ class State:
         self.state = state
         self.n_successors = len(self.state) - 2
         self.successors_list = None
+        self.flip = None
 
     def successors(self, problem):
         """Get successors of self, sorted by cost.
 
         Lazily calculates the successors. If function hasn't been
         called before, successors are calculated and stored.
-        If stored list exists, it is simply retrieved.
+        If stored list exists, it is simply retrieved. If the problem
+        has a successor cache, successors are stored there rather
+        than on the state, and may be evicted and recalculated.
 
         Args:
             problem: namedtuple object as created in parse_problem().
@@ -46,15 +53,31 @@ class State:
         Returns:
             A sorted list of the successors of self.
         """
+        cache = problem.successor_cache
+        if cache is not None:
+            successors = cache.get(self)
+            if successors is None:
+                successors = self._successors(problem)
+                cache.put(self, successors)
+            return successors
         if self.successors_list is None:
-            self.successors_list = []
-            for i in range(1, len(self.state) - 1):
-                first = [self.state[j] for j in range(i)]
-                second = [self.state[j] for j in range(len(self.state)-1, i-1, -1)]
-                new_state = State(tuple(first + second))
-                self.successors_list.append((new_state, cost(self, new_state, problem)))
+            self.successors_list = self._successors(problem)
         return self.successors_list
 
+    def _successors(self, problem):
+        """Calculates the successors of self, as a list of
+        (state, cost) tuples sorted by cost.
+
+        Args:
+            problem: namedtuple object as created in parse_problem().
+        """
+        successors = []
+        s = self.state
+        for i, child in pancake.flips(s):
+            new_state = pancake.intern_state(type(self)(child), problem, flip=i)
+            successors.append((new_state, flip_cost(s, i)))
+        return successors
+
     def __hash__(self):
         return hash(self.state)
 
@@ -62,10 +85,20 @@ class State:
         return f'State(state={self.state})'
 
     def __eq__(self, other):
-        return self.state == other.state
+        return self is other or self.state == other.state
+
+
+class PackedState(pancake.PackedStateMixin, State):
+    """State class for the unit-cost pancake domain, holding the stack
+    packed into a single int. See pancake.PackedStateMixin.
+    """
+
 
+encodings = {'tuple': State,
+             'packed': PackedState}
 
-def parse_problem(problem_str):
+
+def parse_problem(problem_str, encoding='tuple', intern=False, successor_cache=None):
     """Create namedtuple instance of specified problem.
 
     Creates a namedtuple instance containing various information about
@@ -81,15 +114,28 @@ def parse_problem(problem_str):
 
                 A stack of five pancakes, with '1' being the smallest,
                 5 the largest, and 6 the base.
+        encoding: Name of the State class to use, one of 'tuple'
+            and 'packed' (see encodings).
+        intern: If True, the problem is given an intern table, so
+            that each distinct state is created once.
+        successor_cache: If given, the greatest number of states
+            whose successors are held in the problem's LRU successor
+            cache. Otherwise each state holds its own successors.
 
     Returns:
         A namedtuple containing problem information
     """
+    if encoding not in encodings:
+        raise Exception(f'Unknown state encoding: {encoding}. Options are {list(encodings)}')
+    state_type = encodings[encoding]
     initial_tuple = tuple(map(int, problem_str.split(' ')))
     goal_tuple = tuple(range(len(initial_tuple), 0, -1))
-    problem = Problem(initial=State(initial_tuple),
-                      goal=State(goal_tuple),
-                      epsilon=1)
+    initial, goal = state_type(initial_tuple), state_type(goal_tuple)
+    problem = Problem(initial=initial,
+                      goal=goal,
+                      epsilon=1,
+                      intern={initial: initial, goal: goal} if intern else None,
+                      successor_cache=LRUCache(successor_cache) if successor_cache else None)
     return problem
 
 
@@ -111,10 +157,14 @@ def generate_problems(config):
             problems.
     """
     problems = []
+    encoding = config.settings.get('encoding', 'tuple')
+    intern = config.settings.get('intern', False)
+    successor_cache = config.settings.get('successor_cache')
     if config.settings['precompiled']:
         for file_name in config.settings['precompiled']:
             with open(file_name, 'r') as f:
-                problems.append(parse_problem(f.readline()))
+                problems.append(parse_problem(f.readline(), encoding=encoding, intern=intern,
+                                              successor_cache=successor_cache))
     else:
         try:
             n_problems = config.settings['n_problems']
@@ -126,7 +176,8 @@ def generate_problems(config):
             x = [i for i in range(1, param)]
             random.shuffle(x)
             problem_str = ' '.join(map(str, [param] + x))
-            problems.append(parse_problem(problem_str))
+            problems.append(parse_problem(problem_str, encoding=encoding, intern=intern,
+                                          successor_cache=successor_cache))
     return problems
 
 
@@ -144,57 +195,23 @@ def cost(state, other, problem):
     return 1
 
 
-def _not_adjacent(p1, p2, state):
-    """Determines whether or not two pancakes are adjacent in a given
-    state.
+def flip_cost(stack, i):
+    """Returns the cost of the flip at index i, which is 1.
 
     Args:
-        p1: First pancake.
-        p2: Second pancake.
-        state: State to check for adjacency.
-
-    Returns:
-        A boolean value.
+        stack: Parent stack, as a tuple of pancakes.
+        i: Index of the lowest pancake flipped.
     """
-    adj = True
-    for i in range(len(state) - 1):
-        pair = (state[i], state[i+1])
-        if p1 in pair and p2 in pair:
-            adj = False
-    return adj
-
-
-def gap_heuristic_fw(state, goal, degradation, problem):
-    """Forward direction GAP Heuristic function for the unit-pancake
-        domain.
-
-    Calculated by counting the pairs of pancakes which are adjacent in
-    the current state but not in the goal state.
-
-    Heuristic can be degraded by specifying an integer
-    value 0 <= x <= 10, where 0 is perfect heuristic, and 10 is blind.
-    Degradation involves ignoring the top (degradation / 10)% of the
-    pancakes when calculating heuristic.
+    return 1
 
-    Args:
-        state: A state of unit-pancake domain.
-        goal: A state of unit-pancake domain.
-        degradation: An integer between 0 and 10 inclusive.
-        problem: A namedtuple instance representing a unit-pancake
-            problem.
 
-    Returns:
-        A non-negative integer value for the heuristic value of state.
-    """
-    s, g = state.state, goal.state
-    stop_condition = (len(g) - 1) - math.floor((degradation / 10)*len(g))
-    h = sum([int(bool(_not_adjacent(s[i], s[i+1], g))) for i in range(stop_condition)])
-    return h
+# Dense ranks of states, for the 'ranked' closed-list
+rank_state = pancake.rank_state_of
+n_ranks = pancake.n_ranks_of
 
 
-def gap_heuristic_bw(state, goal, degradation, problem):
-    """Backward direction GAP Heuristic function for the unit-pancake
-        domain.
+class GapHeuristic(Heuristic):
+    """GAP Heuristic for the unit-pancake domain, in either direction.
 
     Calculated by counting the pairs of pancakes which are adjacent in
     the current state but not in the goal state.
@@ -204,20 +221,51 @@ def gap_heuristic_bw(state, goal, degradation, problem):
     Degradation involves ignoring the top (degradation / 10)% of the
     pancakes when calculating heuristic.
 
-    Args:
-        state: A state of unit-pancake domain.
-        goal: A state of unit-pancake domain.
-        degradation: An integer between 0 and 10 inclusive.
-        problem: A namedtuple instance representing a unit-pancake
-            problem.
-
-    Returns:
-        A non-negative integer value for the heuristic value of state.
+    The position of each pancake in the goal is tabled once per
+    problem. If the node from which a state was generated is given, the
+    value is updated from the parent's, as a flip changes only one
+    adjacency. The batch form counts the gaps of many states at once,
+    and the profile form gives the gaps below every cutoff.
     """
-    return gap_heuristic_fw(state, goal, degradation, problem)
-
 
-def zero_heuristic(state, goal, degradation, problem):
+    def precompute(self, problem, goal):
+        """Returns the positions of the pancakes in the goal."""
+        return pancake.positions(goal.state)
+
+    def bind(self, goal_pos, degradation, goal, problem):
+        """Returns the callable counting the gaps below the cutoff of degradation."""
+        n = len(goal.state)
+        stop_condition = pancake.stop_index(n, degradation)
+        gaps, gaps_after_flip, flip_index = pancake.gaps, pancake.gaps_after_flip, pancake.flip_index
+
+        def gap_heuristic(state, parent=None):
+            if parent is not None:
+                stack = parent.state.state
+                return gaps_after_flip(parent.h, stack, state.state, flip_index(stack, state), goal_pos,
+                                       stop_condition)
+            return gaps(state.state, goal_pos, stop_condition)
+        return gap_heuristic
+
+    def bind_batch(self, goal_pos, degradation, goal, problem):
+        """Returns the vectorized form of bind(), for a list of states."""
+        n = len(goal.state)
+        stop_condition = pancake.stop_index(n, degradation)
+        goal_pos = np.asarray(goal_pos)
+
+        def gap_heuristic_batch(states):
+            stacks = np.array([state.state for state in states])
+            return pancake.batch_gaps(stacks, goal_pos, stop_condition).tolist()
+        return gap_heuristic_batch
+
+    def bind_profile(self, goal_pos, goal, problem):
+        """Returns the callables giving the gaps of a state below every cutoff, and the cutoff of a degradation."""
+        n = len(goal.state)
+        gap_profile, stop_index = pancake.gap_profile, pancake.stop_index
+        return (lambda state: gap_profile(state.state, goal_pos),
+                lambda degradation: max(stop_index(n, degradation), 0))
+
+
+def zero_heuristic(state, goal, degradation, problem, parent=None):
     """Zero heuristic function.
 
     Args:
@@ -225,6 +273,7 @@ def zero_heuristic(state, goal, degradation, problem):
         goal: A state of unit-pancake domain.
         degradation: Unused.
         problem: Unused.
+        parent: Unused.
 
     Returns:
         Integer value 0
@@ -232,5 +281,10 @@ def zero_heuristic(state, goal, degradation, problem):
     return 0
 
 
+gap_heuristic = GapHeuristic()
+
+pdb_heuristic = pdb.PDBHeuristic(flip_cost, name='unit_pancake')
+
 heuristics = {"zero": (zero_heuristic, zero_heuristic, zero_heuristic),
-              "gap": (gap_heuristic_fw, gap_heuristic_fw, gap_heuristic_bw)}
+              "gap": (gap_heuristic, gap_heuristic, gap_heuristic),
+              "pdb": (pdb_heuristic, pdb_heuristic, pdb_heuristic)}
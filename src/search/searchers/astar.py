@@ -15,13 +15,12 @@ Typical usage:
 __name__ = 'astar'
 __all__ = ['AStarSearch', 'astar']
 
-import functools
 import math
 import sys
 import time
 
 from src.search.utils import datastructures as ds
-from src.search.utils.helpers import write_stats
+from src.search.utils.helpers import as_heuristic, write_stats
 
 
 class AStarSearch:
@@ -33,25 +32,34 @@ class AStarSearch:
         domain: The module reference for the domain being used.
         openlist: OpenList structure containing nodes which have been
             generated but not yet fully expanded.
-        closedlist: ClosedList structure containing states which have
-            been generated and fully expanded.
+        states: StateTable holding the best g-value and open/closed
+            status of every generated state.
         problem: An instance of namedtuple representing a search problem
         goal_node: Node on which a solution is found (initially None)
         best: Best solution cost found so far
+        heuristics: Heuristic objects, of which the first is prepared
+            for each problem
         heuristic: Heuristic function to use during search
+        batch_heuristic: Batch form of heuristic, evaluating all
+            children of an expansion at once, or None if the heuristic
+            has none or batching is disabled
         h_weighting: (Optional) variable used for running weighted A*
     """
     def __init__(self, domain, heuristics, degradation, search_settings):
         """Initializing search object"""
         self.domain = domain
         self.degradation = degradation
-        self.openlist = ds.OpenList()
-        self.closedlist = ds.ClosedList()
+        self.openlist = ds.make_openlist(search_settings)
+        self.states = ds.make_statetable(search_settings, domain)
         self.problem = None
         self.goal_node = None
         self.best = math.inf
 
-        self.heuristic = functools.partial(heuristics[0], degradation=degradation)
+        cache_size = search_settings.get('heuristic_cache')
+        self.heuristics = tuple(as_heuristic(h).configure(search_settings).cached(cache_size) for h in heuristics)
+        self.heuristic = None
+        self.batch = search_settings.get('batch_heuristic', False)
+        self.batch_heuristic = None
         self.h_weighting = search_settings.get('heuristic_weighting', 1)
 
         self.nodes_generated = 1
@@ -60,8 +68,9 @@ class AStarSearch:
     def astar(self):
         """Main flow control for A* search."""
         initial, goal = self.problem.initial, self.problem.goal
-        self.openlist.append(
-            ds.Node(state=initial, g=0, h=(self.heuristic(initial) * self.h_weighting)))
+        root = ds.Node(state=initial, g=0, h=(self.heuristic(initial) * self.h_weighting))
+        self.openlist.append(root)
+        self.states.add(root)
 
         while len(self.openlist) > 0:
             node = self.openlist.peek()
@@ -70,36 +79,40 @@ class AStarSearch:
                 self.best = node.g
                 return
 
-            children = self.expand(node)
-            for child, _ in children:
-                if child in self.closedlist:
-                    continue
-                self.generate_child(child, parent=node)
+            for child, child_g, record, h in self.states.open_children(self.expand(node), self.batch_heuristic):
+                self.generate_child(child, child_g, parent=node, record=record, h=h)
         return
 
-    def generate_child(self, child, parent):
+    def generate_child(self, child, child_g, parent, record=None, h=None):
         """Generates a child node, including heuristic and f-values,
         given a state and parent node. Inserts generated node into open
-        list.
+        list, replacing any node already held for the same state.
 
         Args:
             child: A state object, whose corresponding node is to be
                 generated.
+            child_g: g-value of the child, as given by the parent's
+                expansion, so that its cost need not be recalculated.
             parent: A node object, predecessor of child state.
+            record: The child state's Record in the state table, or
+                None if the state has not been generated before.
+            h: Unweighted heuristic value of the child, if already
+                known.
         """
-        temp_g = parent.g + self.domain.cost(parent.state, child, problem=self.problem)
-        if child in self.openlist and temp_g < self.openlist.get_g(child):
-            self.openlist.replace(child, ds.Node(
-                state=child,
-                g=temp_g,
-                h=(self.heuristic(child) * self.h_weighting),
-                parent=parent))
+        temp_g = child_g
+        if h is None:
+            h = self.heuristic(child, parent=parent if self.h_weighting == 1 else None)
+        child_node = ds.Node(
+            state=child,
+            g=temp_g,
+            h=h * self.h_weighting,
+            parent=parent)
+        if record is None:
+            self.openlist.append(child_node)
+            self.states.add(child_node)
         else:
-            self.openlist.append(ds.Node(
-                state=child,
-                g=temp_g,
-                h=(self.heuristic(child) * self.h_weighting),
-                parent=parent))
+            self.openlist.replace(child, child_node)
+            self.states.update(record, child_node)
         self.nodes_generated += 1
 
     def expand(self, node):
@@ -114,7 +127,7 @@ class AStarSearch:
             A generator expression for the children of node.
         """
         self.openlist.remove(node)
-        self.closedlist.append(node)
+        self.states.close(node)
         self.nodes_expanded += 1
         return (s for s in node.expand(problem=self.problem))
 
@@ -136,15 +149,28 @@ class AStarSearch:
         Args:
             label: A string containing the name of the file to write to.
         """
+        openlist_stats = self.openlist.stats()
+        closedlist_stats = self.states.stats()
+        cache_stats = (self.problem.successor_cache.stats()
+                       if self.problem.successor_cache is not None else {})
+        heuristic_stats = self.heuristics[0].stats()
         original_std = sys.stdout
         sys.stdout = open(f'experiments/runs/human_stats/{label}.out', 'w')
         print(f'Expanded = {self.nodes_expanded}\n'
               f'Generated = {self.nodes_generated}\n'
               f'Solution length = {self.best}\n'
               f'Open list size at end = {len(self.openlist)}\n'
-              f'Closed list size at end = {len(self.closedlist)}\n'
+              f'Closed list size at end = {self.states.n_closed}\n'
               f'Expansion = {self.expand}\n'
               f'Weighting = {self.h_weighting}')
+        for stat, value in openlist_stats.items():
+            print(f'Open list {stat} = {value}')
+        for stat, value in closedlist_stats.items():
+            print(f'Closed list {stat} = {value}')
+        for stat, value in cache_stats.items():
+            print(f'Successor cache {stat} = {value}')
+        for stat, value in heuristic_stats.items():
+            print(f'Heuristic {stat} = {value}')
         sys.stdout = original_std
 
         split_label = label.split('_')
@@ -155,7 +181,11 @@ class AStarSearch:
                     expanded=self.nodes_expanded,
                     generated=self.nodes_generated,
                     open_list_size_end=len(self.openlist),
-                    closed_list_size_end=len(self.closedlist))
+                    closed_list_size_end=self.states.n_closed,
+                    **openlist_stats,
+                    **{f'closed_list_{stat}': value for stat, value in closedlist_stats.items()},
+                    **{f'successor_cache_{stat}': value for stat, value in cache_stats.items()},
+                    **{f'heuristic_{stat}': value for stat, value in heuristic_stats.items()})
 
     def __call__(self, problem, label):
         """Runs an instance of AStarSearch.
@@ -169,9 +199,16 @@ class AStarSearch:
                 statistics to.
         """
         self.problem = problem
-        self.heuristic = functools.partial(self.heuristic, goal=problem.goal, problem=problem)
+        if problem.successor_cache is not None:
+            problem.successor_cache.reset_stats()
+        self.heuristic = self.heuristics[0].prepare(problem, self.degradation, goal=problem.goal)
+        if self.batch:
+            self.batch_heuristic = self.heuristics[0].prepare_batch(problem, self.degradation, goal=problem.goal)
         since = time.perf_counter()
-        self.astar()
-        now = time.perf_counter()
-        print(f'All done! ({(now - since) // 60})m {(now - since) % 60}s')
-        self.write_out(label)
+        try:
+            self.astar()
+            now = time.perf_counter()
+            print(f'All done! ({(now - since) // 60})m {(now - since) % 60}s')
+            self.write_out(label)
+        finally:
+            self.states.release()
@@ -12,13 +12,12 @@ Typical usage:
 __name__ = 'gpe_bsharp'
 __all__ = ['BSharpSearch']
 
-import functools
 from math import inf
 import sys
 import time
 
 from src.search.utils import datastructures as ds
-from src.search.utils.helpers import write_stats
+from src.search.utils.helpers import as_heuristic, write_stats
 
 
 class BSharpSearch:
@@ -30,8 +29,9 @@ class BSharpSearch:
         domain: The module reference for the domain being used.
         openlist: OpenList structure containing nodes which have been
             generated but not yet fully expanded.
-        closedlist: ClosedList structure containing states which have
-            been generated and fully expanded.
+        states: StateTable structures (one per direction) holding the
+            best g-value and open/closed status of every generated
+            state.
         initial: Initial state of search
         goal: Goal state of search
         epsilon: Cost of cheapest operator in domain
@@ -40,14 +40,23 @@ class BSharpSearch:
         fLim: Maximum f-value from which nodes can no longer be expanded
         goal_node: Node on which a solution is found (initially None)
         best: Best solution cost found so far
+        heuristics: Heuristic objects, of which the second and third
+            are prepared for each problem
         heuristic_fw: Forward heuristic function to use during search
         heuristic_bw: Backward heuristic function to use during search
+        batch_heuristic: Dict of the batch forms of the heuristics by
+            direction, evaluating all children of an expansion at once,
+            each None if the heuristic has none or batching is disabled
     """
     def __init__(self, domain, heuristics, degradation, search_settings):
         self.domain = domain
         self.degradation = degradation
-        self.heuristic_fw = functools.partial(heuristics[1], degradation=degradation)
-        self.heuristic_bw = functools.partial(heuristics[2], degradation=degradation)
+        cache_size = search_settings.get('heuristic_cache')
+        self.heuristics = tuple(as_heuristic(h).configure(search_settings).cached(cache_size) for h in heuristics)
+        self.heuristic_fw = None
+        self.heuristic_bw = None
+        self.batch = search_settings.get('batch_heuristic', False)
+        self.batch_heuristic = {1: None, -1: None}
         self.initial = None
         self.goal = None
         self.epsilon = None
@@ -55,14 +64,16 @@ class BSharpSearch:
         self.gLim = {1: 0,
                      -1: 0}
         self.fLim = 0
+        self.expandable_since = {1: None, -1: None}
+        self.deferred = {1: set(), -1: set()}
 
         self.openlist = {
-            1: ds.OpenList(),  # forward
-            -1: ds.OpenList()  # backward
+            1: ds.make_openlist(search_settings),  # forward
+            -1: ds.make_openlist(search_settings)  # backward
             }
-        self.closedlist = {
-            1: ds.ClosedList(),
-            -1: ds.ClosedList()
+        self.states = {
+            1: ds.make_statetable(search_settings, domain),
+            -1: ds.make_statetable(search_settings, domain)
         }
 
         self.split = search_settings['split']
@@ -84,19 +95,17 @@ class BSharpSearch:
         self.initial, self.goal = self.problem.initial, self.problem.goal
         self.epsilon = self.problem.epsilon
 
-        self.openlist[1].append(ds.Node(
-            state=self.initial,
-            g=0,
-            h=self.heuristic_fw(self.initial),
-            direction=1
-        ))
-
-        self.openlist[-1].append(ds.Node(
-            state=self.goal,
-            g=0,
-            h=self.heuristic_bw(self.goal),
-            direction=-1
-        ))
+        roots = (ds.Node(state=self.initial,
+                         g=0,
+                         h=self.heuristic_fw(self.initial),
+                         direction=1),
+                 ds.Node(state=self.goal,
+                         g=0,
+                         h=self.heuristic_bw(self.goal),
+                         direction=-1))
+        for root in roots:
+            self.openlist[root.direction].append(root)
+            self.states[root.direction].add(root)
 
         self.fLim = max(self.heuristic_fw(self.initial),
                         self.heuristic_bw(self.goal),
@@ -130,36 +139,33 @@ class BSharpSearch:
             self.fractional_expansion -= (n.n_expanded / n.state.n_successors)
 
             if n.n_expanded == 0 and not n.expanded_nonce:
-                self.started_0_expansion[dir].add(n.state.state)
-                self.expanded_this_layer[dir].add(n.state.state)
+                self.started_0_expansion[dir].add(n.state)
+                self.expanded_this_layer[dir].add(n.state)
                 n.expanded_nonce = True
 
             gen_limit_1 = self.gLim[dir] + self.epsilon - 1
             gen_limit_2 = self.fLim - self.openlist[-1 * dir].min_g()
-            for child_state, child_g in self.expand(n, gen_limit=(self.fLim - self.openlist[-1 * dir].min_g())):
-                if child_state in self.closedlist[dir]:
-                    continue
-                elif child_state in self.openlist[dir]:
-                    prev_c_g = self.openlist[dir].get_g(child_state)
-                    if child_g >= prev_c_g:
-                        continue
-
-                if n.n_expanded == 1 and not n.expanded_once:
-                    self.started_1_expansion[dir].add(n.state.state)
-                    n.once_expanded = True
+            # The node's count of children generated is passed through with each child
+            expansion = ((s, g, n.n_expanded) for s, g in self.expand(n, gen_limit=gen_limit_2))
+            children = self.states[dir].open_children(expansion, self.batch_heuristic[dir])
+            for child_state, child_g, record, h, n_expanded in children:
+                if n_expanded == 1:
+                    self.started_1_expansion[dir].add(n.state)
 
                 if self.gLim[dir] + self.epsilon - 1 < child_g <= self.fLim - self.openlist[-1 * dir].min_g():
                     self.zone_3_count += 1
                 self.total_count += 1
-                child_node = self.generate_child(child_state, parent=n)
+                child_node = self.generate_child(child_state, child_g, parent=n, record=record, h=h)
                 if child_node.g < self.gLim[dir] and child_node.f <= self.fLim:
                     expandable.add(child_node)
 
-                if child_node in self.openlist[-1 * dir]:  # opposite openlist
+                opposite = self.states[-1 * dir].get(child_state)
+                if opposite is not None and opposite.status == ds.OPEN:
                     old_best = self.best
-                    self.best = min(self.best, child_node.g + self.openlist[-1 * dir].get_g(child_state))
+                    self.best = min(self.best, child_node.g + opposite.g)
                     if old_best != self.best:
-                        self.collision_nodes = (self.openlist[1].get(child_state), self.openlist[-1].get(child_state))
+                        self.collision_nodes = ((child_node, opposite.node) if dir == 1
+                                                else (opposite.node, child_node))
                     # if self.best <= self.fLim:
                     #     return
 
@@ -167,41 +173,51 @@ class BSharpSearch:
 
             if n.is_fully_expanded():
                 self.openlist[dir].remove(n)
-                self.closedlist[dir].append(n)
+                self.states[dir].close(n)
                 self.nodes_expanded += 1
                 continue
 
             elif n.G <= self.fLim - self.openlist[-1 * dir].min_g():
                 expandable.add(n)
+            else:
+                self.deferred[dir].add(n)
 
         return
 
-    def generate_child(self, child_state, parent):
+    def generate_child(self, child_state, child_g, parent, record=None, h=None):
         """Generates a child node, including heuristic and f-values,
         given a state and parent node. Inserts generated node into open
-        list.
+        list, replacing any node already held for the same state.
 
         Args:
             child: A state object, whose corresponding node is to be
                 generated.
+            child_g: g-value of the child, as given by the parent's
+                expansion, so that its cost need not be recalculated.
             parent: A node object, predecessor of child state.
+            record: The child state's Record in the state table, or
+                None if the state has not been generated before.
+            h: Heuristic value of the child, if already known.
         """
-        temp_g = parent.g + self.domain.cost(parent.state, child_state, problem=self.problem)
+        temp_g = child_g
         dir = parent.direction
-        if child_state in self.openlist[dir]:
-            self.openlist[dir].remove(child_state)
-        if child_state in self.closedlist[dir]:
-            self.closedlist[dir].remove(child_state)
+        if h is None:
+            h = (self.heuristic_fw(child_state, parent=parent) if dir == 1
+                 else self.heuristic_bw(child_state, parent=parent))
 
         c_node = ds.Node(
             state=child_state,
             g=temp_g,
-            h=self.heuristic_fw(child_state) if dir == 1 else self.heuristic_bw(child_state),
+            h=h,
             direction=parent.direction,
             parent=parent
         )
 
         self.nodes_generated += 1
+        if record is None:
+            self.states[dir].add(c_node)
+        else:
+            self.states[dir].update(record, c_node)
         self.openlist[dir].append(c_node)
         return c_node
 
@@ -209,14 +225,23 @@ class BSharpSearch:
         """Gets all nodes expandable nodes with the current fLIM and
         gLim.
 
+        Only nodes which have become expandable since the previous
+        layer are retrieved from the open-lists, along with the
+        partially expanded nodes deferred during the previous layer.
+
         Returns:
             A set containing all expandable nodes from either openlist.
         """
-        expandable_f = {node for node in self.openlist[1]
-                        if node.f <= self.fLim and node.g < self.gLim[1]}
-        expandable_b = {node for node in self.openlist[-1]
-                        if node.f <= self.fLim and node.g < self.gLim[-1]}
-        expandable = expandable_f.union(expandable_b)
+        expandable = set()
+        for dir in (1, -1):
+            expandable.update(self.openlist[dir].expandable(
+                self.fLim, self.gLim[dir], since=self.expandable_since[dir]))
+            self.expandable_since[dir] = (self.fLim, self.gLim[dir])
+            for n in self.deferred[dir]:
+                record = self.states[dir].get(n.state)
+                if record.status == ds.OPEN and record.node is n:
+                    expandable.add(n)
+            self.deferred[dir] = set()
         return expandable
 
     def goal_test(self, state, goal):
@@ -264,6 +289,19 @@ class BSharpSearch:
         solution_path = f'{self.collision_nodes[0].path()[:-1]} ' \
                         f'+ {(self.collision_nodes[0].g, self.collision_nodes[0].state.state)} ' \
                         f'+ {self.collision_nodes[1].path(reverse=True)[1:]}'
+        openlist_stats = {f'{stat}_{suffix}': value
+                          for dir, suffix in ((1, 'fw'), (-1, 'bw'))
+                          for stat, value in self.openlist[dir].stats().items()}
+        closedlist_stats = {f'{stat}_{suffix}': value
+                            for dir, suffix in ((1, 'fw'), (-1, 'bw'))
+                            for stat, value in self.states[dir].stats().items()}
+        cache_stats = (self.problem.successor_cache.stats()
+                       if self.problem.successor_cache is not None else {})
+        # The heuristics of both directions may be one object, so stats are asked of each by goal
+        heuristic_stats = {f'{stat}_{suffix}': value
+                           for heuristic, goal, suffix in ((self.heuristics[1], self.goal, 'fw'),
+                                                           (self.heuristics[2], self.initial, 'bw'))
+                           for stat, value in heuristic.stats(goal=goal).items()}
         original_std = sys.stdout
         sys.stdout = open(f'experiments/runs/human_stats/{label}.out', 'w')
         print(f'Problem = {self.problem.initial}\n'
@@ -274,11 +312,19 @@ class BSharpSearch:
               f'Generated at least one child = {len(self.started_1_expansion[1]) + len(self.started_1_expansion[-1])}\n'
               f'Open list size at end (fw) = {len(self.openlist[1])}\n'
               f'Open list size at end (bw) = {len(self.openlist[-1])}\n'
-              f'Closed list size at end (fw) = {len(self.closedlist[1])}\n'
-              f'Closed list size at end (bw) = {len(self.closedlist[-1])}\n'
+              f'Closed list size at end (fw) = {self.states[1].n_closed}\n'
+              f'Closed list size at end (bw) = {self.states[-1].n_closed}\n'
               f'Solution length = {self.best}\n'
               f'Solution path = {solution_path}\n'
-              f'Heuristic = {self.heuristic_fw}')
+              f'Heuristic = {self.heuristics[1]}')
+        for stat, value in openlist_stats.items():
+            print(f'Open list {stat} = {value}')
+        for stat, value in closedlist_stats.items():
+            print(f'Closed list {stat} = {value}')
+        for stat, value in cache_stats.items():
+            print(f'Successor cache {stat} = {value}')
+        for stat, value in heuristic_stats.items():
+            print(f'Heuristic {stat} = {value}')
         sys.stdout = original_std
 
         split_label = label.split('_')
@@ -289,11 +335,15 @@ class BSharpSearch:
                     expanded=self.nodes_expanded,
                     generated=self.nodes_generated,
                     open_list_size_end=len(self.openlist[-1]) + len(self.openlist[1]),
-                    closed_list_size_end=len(self.closedlist[-1]) + len(self.openlist[1]),
+                    closed_list_size_end=self.states[-1].n_closed + self.states[1].n_closed,
                     open_list_size_end_fw=len(self.openlist[1]),
                     open_list_size_end_bw=len(self.openlist[-1]),
-                    closed_list_size_end_fw=len(self.closedlist[1]),
-                    closed_list_size_end_bw=len(self.closedlist[-1]))
+                    closed_list_size_end_fw=self.states[1].n_closed,
+                    closed_list_size_end_bw=self.states[-1].n_closed,
+                    **openlist_stats,
+                    **{f'closed_list_{stat}': value for stat, value in closedlist_stats.items()},
+                    **{f'successor_cache_{stat}': value for stat, value in cache_stats.items()},
+                    **{f'heuristic_{stat}': value for stat, value in heuristic_stats.items()})
 
     def __call__(self, problem, label):
         """Runs an instance of BSharpSearch.
@@ -307,12 +357,23 @@ class BSharpSearch:
                 statistics to.
         """
         self.problem = problem
-        self.heuristic_fw = functools.partial(self.heuristic_fw, goal=problem.goal, problem=problem)
-        self.heuristic_bw = functools.partial(self.heuristic_bw, goal=problem.initial, problem=problem)
+        if problem.successor_cache is not None:
+            problem.successor_cache.reset_stats()
+        self.heuristic_fw = self.heuristics[1].prepare(problem, self.degradation, goal=problem.goal)
+        self.heuristic_bw = self.heuristics[2].prepare(problem, self.degradation, goal=problem.initial)
+        if self.batch:
+            self.batch_heuristic = {
+                1: self.heuristics[1].prepare_batch(problem, self.degradation, goal=problem.goal),
+                -1: self.heuristics[2].prepare_batch(problem, self.degradation, goal=problem.initial)
+            }
 
         print('Starting bsharp')
         since = time.perf_counter()
-        self.bsharp()
-        now = time.perf_counter()
-        print(f'All done! ({(now - since) // 60})m {(now - since) % 60}s')
-        self.write_out(label)
+        try:
+            self.bsharp()
+            now = time.perf_counter()
+            print(f'All done! ({(now - since) // 60})m {(now - since) % 60}s')
+            self.write_out(label)
+        finally:
+            for states in self.states.values():
+                states.release()
@@ -0,0 +1,239 @@
+"""IDA* Search implementation.
+
+Search is represented by a callable class which is instantiated with
+desired settings.
+
+IDA* runs a series of depth-first searches, each bounded by an f-value
+threshold, raising the threshold to the least f-value pruned by the
+previous iteration. Memory is linear in the solution depth: each depth
+of the search reuses one frame, rather than allocating a node per
+visit, and a state's successors are released when the search
+backtracks past it. Successors are visited in the order of the domain's
+sorted successor lists, cheapest first.
+
+Typical usage:
+
+    searcher = IDAStarSearch(unit_pancake, gap_heuristic, 0, search_settings)
+    searcher(my_problem, "my_search")
+"""
+
+__name__ = 'idastar'
+__all__ = ['IDAStarSearch']
+
+import math
+import sys
+import time
+
+from src.search.utils.helpers import as_heuristic, write_stats
+
+
+class _Frame:
+    """Frame of the depth-first search at one depth, reused by every
+    state visited at that depth. Frames stand in for nodes as the parent
+    passed to heuristics.
+
+    Attributes:
+        state: The state visited.
+        g: Cost of the path to state.
+        h: Heuristic value of state.
+        successors: The sorted (state, cost) successors of state, or
+            None before state is expanded.
+        i: Index in successors of the next successor to visit.
+    """
+
+    __slots__ = ('state', 'g', 'h', 'successors', 'i')
+
+    def __init__(self):
+        """Initializes an empty _Frame."""
+        self.state = None
+        self.g = 0
+        self.h = 0
+        self.successors = None
+        self.i = 0
+
+
+class IDAStarSearch:
+    """IDAStarSearch allows for the dynamic creation of easily
+    configurable IDA* searchers, which can be called to run on
+    specified problems.
+
+    Attributes:
+        domain: The module reference for the domain being used.
+        problem: An instance of namedtuple representing a search problem
+        best: Best solution cost found so far
+        solution: The states of the solution path, or None
+        heuristics: Heuristic objects, of which the first is prepared
+            for each problem
+        heuristic: Heuristic function to use during search
+        frames: The _Frame of each depth reached so far.
+        iterations: A list of dicts of the threshold, and nodes expanded
+            and generated, of each iteration.
+    """
+    def __init__(self, domain, heuristics, degradation, search_settings):
+        """Initializing search object"""
+        self.domain = domain
+        self.degradation = degradation
+        self.problem = None
+        self.best = math.inf
+        self.solution = None
+
+        cache_size = search_settings.get('heuristic_cache')
+        self.heuristics = tuple(as_heuristic(h).configure(search_settings).cached(cache_size) for h in heuristics)
+        self.heuristic = None
+        self.frames = []
+        self.iterations = []
+
+        self.nodes_generated = 1
+        self.nodes_expanded = 0
+
+    def idastar(self):
+        """Main flow control for IDA* search."""
+        initial = self.problem.initial
+        threshold = self.heuristic(initial)
+        while threshold < math.inf:
+            expanded, generated = self.nodes_expanded, self.nodes_generated
+            next_threshold = self.bounded_search(threshold)
+            self.iterations.append({'threshold': threshold,
+                                    'expanded': self.nodes_expanded - expanded,
+                                    'generated': self.nodes_generated - generated})
+            if self.solution is not None:
+                return
+            threshold = next_threshold
+        return
+
+    def bounded_search(self, threshold):
+        """Runs one depth-first iteration from the initial state,
+        pruning states whose f-value exceeds threshold. Sets best and
+        solution if a goal is found.
+
+        Args:
+            threshold: The greatest f-value of a state visited.
+
+        Returns:
+            The least f-value pruned, or math.inf if none was.
+        """
+        problem, goal, heuristic = self.problem, self.problem.goal, self.heuristic
+        frames = self.frames
+        if not frames:
+            frames.append(_Frame())
+        root = frames[0]
+        root.state, root.g, root.h, root.successors = problem.initial, 0, heuristic(problem.initial), None
+        next_threshold = math.inf
+        depth = 0
+        while depth >= 0:
+            frame = frames[depth]
+            if frame.successors is None:
+                if self.goal_test(frame.state, goal):
+                    self.best = frame.g
+                    self.solution = [f.state for f in frames[:depth + 1]]
+                    return next_threshold
+                frame.successors, frame.i = frame.state.successors(problem), 0
+                self.nodes_expanded += 1
+            if frame.i == len(frame.successors):
+                self.release(frame)
+                depth -= 1
+                continue
+            child, cost = frame.successors[frame.i]
+            frame.i += 1
+            # Skip the move straight back to the grandparent state
+            if depth > 0 and child == frames[depth - 1].state:
+                continue
+            self.nodes_generated += 1
+            g = frame.g + cost
+            h = heuristic(child, parent=frame)
+            if g + h > threshold:
+                next_threshold = min(next_threshold, g + h)
+                continue
+            depth += 1
+            if depth == len(frames):
+                frames.append(_Frame())
+            child_frame = frames[depth]
+            child_frame.state, child_frame.g, child_frame.h, child_frame.successors = child, g, h, None
+        return next_threshold
+
+    def release(self, frame):
+        """Releases the successors of a frame's state as the search
+        backtracks past it, so that states visited earlier in the
+        iteration do not hold their subtrees.
+
+        Args:
+            frame: A _Frame whose successors have all been visited.
+        """
+        if self.problem.successor_cache is None:
+            frame.state.successors_list = None
+        frame.successors = None
+
+    def goal_test(self, state, goal):
+        """Tests whether a state is a goal.
+
+        Args:
+            state: State object to test as a goal
+            goal: State object representing the goal
+
+        Returns:
+            A boolean value as to whether state is a goal.
+        """
+        return state == goal
+
+    def write_out(self, label):
+        """Writes specific statistics about search to a file.
+
+        Args:
+            label: A string containing the name of the file to write to.
+        """
+        cache_stats = (self.problem.successor_cache.stats()
+                       if self.problem.successor_cache is not None else {})
+        heuristic_stats = self.heuristics[0].stats()
+        original_std = sys.stdout
+        sys.stdout = open(f'experiments/runs/human_stats/{label}.out', 'w')
+        print(f'Expanded = {self.nodes_expanded}\n'
+              f'Generated = {self.nodes_generated}\n'
+              f'Solution length = {self.best}\n'
+              f'Iterations = {len(self.iterations)}\n'
+              f'Greatest depth = {len(self.frames) - 1}\n'
+              f'Heuristic = {self.heuristics[0]}')
+        for i, iteration in enumerate(self.iterations):
+            print(f'Iteration {i}: threshold = {iteration["threshold"]}, '
+                  f'expanded = {iteration["expanded"]}, generated = {iteration["generated"]}')
+        for stat, value in cache_stats.items():
+            print(f'Successor cache {stat} = {value}')
+        for stat, value in heuristic_stats.items():
+            print(f'Heuristic {stat} = {value}')
+        sys.stdout = original_std
+
+        split_label = label.split('_')
+        split_label = split_label[:-2] + [split_label[-1]]
+        stats_label = '_'.join(split_label)
+        write_stats(f'experiments/runs/stats/{stats_label}.csv',
+                    degradation=self.degradation,
+                    expanded=self.nodes_expanded,
+                    generated=self.nodes_generated,
+                    iterations=len(self.iterations),
+                    final_threshold=self.iterations[-1]['threshold'] if self.iterations else None,
+                    **{f'successor_cache_{stat}': value for stat, value in cache_stats.items()},
+                    **{f'heuristic_{stat}': value for stat, value in heuristic_stats.items()})
+        with open(f'experiments/runs/stats/{label}_iterations.csv', 'w') as f:
+            f.write('iteration,threshold,expanded,generated\n')
+            for i, iteration in enumerate(self.iterations):
+                f.write(f'{i},{iteration["threshold"]},{iteration["expanded"]},{iteration["generated"]}\n')
+
+    def __call__(self, problem, label):
+        """Runs an instance of IDAStarSearch.
+
+        Callable method accessed by calling an instance of this class.
+
+        Args:
+            problem: A namedtuple representing the problem instance to
+                run.
+            label: String containing the name of the file to write
+                statistics to.
+        """
+        self.problem = problem
+        if problem.successor_cache is not None:
+            problem.successor_cache.reset_stats()
+        self.heuristic = self.heuristics[0].prepare(problem, self.degradation, goal=problem.goal)
+        since = time.perf_counter()
+        self.idastar()
+        now = time.perf_counter()
+        print(f'All done! ({(now - since) // 60})m {(now - since) % 60}s')
+        self.write_out(label)
@@ -1,8 +1,28 @@
 from .openlist import *
+from .bucketopenlist import *
+from .lazyopenlist import *
 from .closedlist import *
+from .rankedclosedlist import *
+from .bloomclosedlist import *
+from .tieredclosedlist import *
 from .node import *
+from .valuetracker import *
+from .statetable import *
+from .densestatetable import *
+from .lrucache import *
+from .factory import *
 from .problemstruct import Problem
 
 __all__ = (openlist.__all__
+           + bucketopenlist.__all__
+           + lazyopenlist.__all__
            + closedlist.__all__
-           + node.__all__)
+           + rankedclosedlist.__all__
+           + bloomclosedlist.__all__
+           + tieredclosedlist.__all__
+           + node.__all__
+           + valuetracker.__all__
+           + statetable.__all__
+           + densestatetable.__all__
+           + lrucache.__all__
+           + factory.__all__)
@@ -0,0 +1,143 @@
+"""Approximate closed-list backed by a Bloom filter.
+
+Membership is recorded by setting a few bits of a fixed-size bit array
+chosen by hashing the state, so that memory use does not grow with the
+number of closed states. States which were never closed may be
+reported as closed (false positives), but closed states are never
+missed.
+
+Typical usage:
+
+    closed_list = BloomClosedList(size=2 ** 27, n_hashes=4)
+    closed_list.append(node)
+    if node.state in closed_list:
+        print(closed_list.stats())
+"""
+
+__all__ = ['BloomClosedList']
+
+from math import exp
+
+from .node import Node
+
+_MASK_64 = (1 << 64) - 1
+
+
+def _mix(h):
+    """Returns the 64-bit finalizer of splitmix64 applied to h, so that
+    hashes which are small ints (such as those of packed and bitmask
+    states) spread over all 64 bits."""
+    h = (h ^ (h >> 30)) * 0xbf58476d1ce4e5b9 & _MASK_64
+    h = (h ^ (h >> 27)) * 0x94d049bb133111eb & _MASK_64
+    return h ^ (h >> 31)
+
+
+class BloomClosedList:
+    """Closed-list storing states as hashed bits of a Bloom filter.
+
+    The n_hashes bit positions of a state are derived from its mixed
+    hash by double hashing. The bit array is allocated on the first append, so
+    that unused searchers hold no memory.
+
+    Attributes:
+        size: Number of bits in the filter.
+        n_hashes: Number of bits set per state.
+        bits: A bytearray of size bits, or None before the first
+            append.
+        n_closed: Number of states appended which were not already
+            reported as members.
+    """
+
+    def __init__(self, size=2 ** 27, n_hashes=4):
+        """Initializes BloomClosedList with no bit array.
+
+        Args:
+            size: Number of bits in the filter.
+            n_hashes: Number of bits set per state.
+
+        Raises:
+            Exception if size or n_hashes is not positive.
+        """
+        if size < 1 or n_hashes < 1:
+            raise Exception('BloomClosedList requires a positive size and number of hashes.')
+        self.size = int(size)
+        self.n_hashes = int(n_hashes)
+        self.bits = None
+        self.n_closed = 0
+
+    def append(self, node):
+        """Adds a node's state to the closed-list.
+
+        Args:
+            node: A node object.
+        """
+        if self.bits is None:
+            self.bits = bytearray((self.size + 7) // 8)
+        bits = self.bits
+        new = False
+        for i in self._positions(node.state):
+            mask = 1 << (i & 7)
+            if not bits[i >> 3] & mask:
+                bits[i >> 3] |= mask
+                new = True
+        if new:
+            self.n_closed += 1
+
+    def false_positive_rate(self):
+        """Returns the estimated probability that a state never added
+        is reported as a member, (1 - e^(-kn/m))^k for k hashes, n
+        states and m bits."""
+        return (1 - exp(-self.n_hashes * self.n_closed / self.size)) ** self.n_hashes
+
+    def stats(self):
+        """Returns the size of the filter and its estimated
+        false-positive rate.
+
+        Returns:
+            A dict of {'stat': value}.
+        """
+        return {'bloom_size': self.size,
+                'bloom_hashes': self.n_hashes,
+                'false_positive_rate': self.false_positive_rate()}
+
+    def _positions(self, state):
+        """Yields the n_hashes bit positions of a state.
+
+        Args:
+            state: A state object.
+        """
+        h = _mix(hash(state) & _MASK_64)
+        h1, h2 = h & 0xffffffff, (h >> 32) | 1
+        for i in range(self.n_hashes):
+            yield (h1 + i * h2) % self.size
+
+    def _node_to_state(self, obj):
+        """Checks if an object is a node or a state, and returns the associated state.
+
+        Args:
+            obj: An object of type either Node or State.
+
+        Returns:
+            An object of type state, associated with obj.
+        """
+        if isinstance(obj, Node):
+            return obj.state
+        else:
+            return obj
+
+    def __len__(self):
+        """Returns the number of states added to the closed-list."""
+        return self.n_closed
+
+    def __contains__(self, obj):
+        """Returns True if the state associated with obj is (probably)
+        in the closed-list.
+
+        Args:
+            obj: An object of type either Node or State.
+        """
+        if self.bits is None:
+            return False
+        bits = self.bits
+        return all(bits[i >> 3] & (1 << (i & 7))
+                   for i in self._positions(self._node_to_state(obj)))
@@ -0,0 +1,333 @@
+"""Bucket-based open-list data structure for integer-cost domains.
+
+Typical usage:
+
+open_list = BucketOpenList()
+open_list.append(node)
+for node in open_list.expandable(f_lim=10, g_lim=4):
+    print(node)
+"""
+
+__all__ = ['BucketOpenList']
+
+from math import inf
+
+from .node import Node
+from .valuetracker import ValueTracker
+
+
+class BucketOpenList:
+    """Open-list for domains with small integer f- and g-values.
+
+    Nodes are stored in two-level buckets: an array indexed by f-value,
+    each entry of which maps g-values to the nodes holding them. A
+    pointer to the lowest non-empty f-bucket moves forward as buckets
+    empty, so that push and pop are O(1) (amortised over the distinct
+    g-values in the lowest f-bucket). Among the nodes of least f-value
+    the node with greatest g-value (equivalently, least h-value) is
+    popped first, and the most recently inserted of those.
+
+    Offers the same interface as OpenList, and holds at most one node
+    per state.
+
+    Attributes:
+        buckets: A list indexed by f-value, each entry a dict mapping
+            g-value to a dict of {state: node}.
+        f_counts: A list indexed by f-value, giving the number of nodes
+            in each f-bucket.
+        min_f_idx: Index of the lowest non-empty f-bucket.
+        index: A dict mapping each state in the open-list to its node.
+        g_tracker: A ValueTracker counting the g-values in the
+            open-list.
+    """
+
+    def __init__(self, tie_breaking='high_g'):
+        """Initializes open-list with no buckets.
+
+        Args:
+            tie_breaking: Name of the policy ordering nodes of equal
+                f-value. Bucket order fixes this as 'high_g', which
+                coincides with 'low_h' for integer costs.
+
+        Raises:
+            Exception if tie_breaking is not supported by buckets.
+        """
+        if tie_breaking not in ('high_g', 'low_h'):
+            raise Exception(f'BucketOpenList does not support tie-breaking policy: {tie_breaking}. '
+                            f"Options are ['high_g', 'low_h']")
+        self.buckets = []
+        self.f_counts = []
+        self.min_f_idx = 0
+        self.index = {}
+        self.g_tracker = ValueTracker()
+
+    def append(self, node):
+        """Adds a node to the bucket matching its f- and g-values.
+
+        If a node with the same state is already present, it is
+        replaced by node.
+
+        Args:
+            node: Expected to be of type Node, with integer f and g.
+
+        Raises:
+            Exception if node has non-integer f or g.
+        """
+        if node.state in self.index:
+            self._discard(self.index[node.state])
+        f, g = self._keys(node)
+        while len(self.buckets) <= f:
+            self.buckets.append({})
+            self.f_counts.append(0)
+        f_bucket = self.buckets[f]
+        if g not in f_bucket:
+            f_bucket[g] = {}
+        f_bucket[g][node.state] = node
+        self.f_counts[f] += 1
+        if f < self.min_f_idx or not self.index:
+            self.min_f_idx = f
+        self.index[node.state] = node
+        self.g_tracker.add(node.g)
+
+    def pop(self):
+        """Removes and returns the highest-priority element in
+        open-list.
+
+        Returns:
+            Object of type Node, with least f-value and, among those,
+                greatest g-value.
+        """
+        out = self.peek()
+        self._discard(out)
+        return out
+
+    def peek(self):
+        """Returns highest-priority element in open-list without
+        removing it.
+
+        Returns:
+            Object of type Node, with least f-value and, among those,
+                greatest g-value.
+
+        Raises:
+            IndexError if the open-list is empty.
+        """
+        if not self.index:
+            raise IndexError('peek from empty open-list')
+        while not self.f_counts[self.min_f_idx]:
+            self.min_f_idx += 1
+        f_bucket = self.buckets[self.min_f_idx]
+        g_bucket = f_bucket[max(f_bucket)]
+        return g_bucket[next(reversed(g_bucket))]
+
+    def get_g(self, state):
+        """Returns the g-value of a node in the open-list, as specified
+        by the node's state. If node is not found, default value of
+        infinity is returned.
+
+        Args:
+            state: State object of node requested.
+
+        Returns:
+            g-value of node associated with state, in the open list.
+        """
+        node = self.index.get(state)
+        if node is None:
+            return inf
+        return node.g
+
+    def get(self, state):
+        """Returns from the open-list the node associated with
+        specified state.
+
+        Args:
+            state: State object of node requested.
+
+        Returns:
+            Node object from open-list with state attribute
+                equal to state input.
+
+        Raises:
+            Exception if no node with provided state exists in open-list.
+        """
+        node = self.index.get(state)
+        if node is None:
+            raise Exception("Node not found.")
+        return node
+
+    def replace(self, obj, other):
+        """Replaces a node in the open-list with a new node.
+
+        Args:
+            obj: Object of type Node or State.
+            other: Node object, to replace obj.
+
+        Raises:
+            Exception if no node with specified state exists in
+                open-list.
+        """
+        self.remove(obj)
+        self.append(other)
+
+    def remove(self, obj):
+        """Removes a specified node from the open-list.
+
+        Args:
+            obj: Object of type Node or State.
+
+        Raises:
+            Exception if no node with specified state exists in
+                open-list.
+        """
+        self._discard(self.get(self._node_to_state(obj)))
+
+    def expandable(self, f_lim, g_lim, since=None):
+        """Yields every node with f <= f_lim and g < g_lim, visiting
+        only the buckets within those limits.
+
+        If since is given as a previous pair of limits (f_since,
+        g_since), nodes which already fell within those limits are
+        skipped, so only newly expandable nodes are yielded.
+
+        Args:
+            f_lim: Inclusive upper limit on f-value.
+            g_lim: Exclusive upper limit on g-value.
+            since: Optional tuple (f_since, g_since) of earlier limits.
+
+        Returns:
+            A generator of Node objects.
+        """
+        if not self.index:
+            return
+        f_since, g_since = since if since is not None else (-inf, -inf)
+        for f in range(self.min_f_idx, min(int(f_lim), len(self.buckets) - 1) + 1):
+            if not self.f_counts[f]:
+                continue
+            for g, g_bucket in self.buckets[f].items():
+                if g < g_lim and (f > f_since or g >= g_since):
+                    yield from g_bucket.values()
+
+    def min_g(self):
+        """Returns the least g-value among nodes in the open list.
+
+        Returns:
+            An integer value, or infinity if the open-list is empty.
+        """
+        return self.g_tracker.min()
+
+    def max_g(self):
+        """Returns the greatest g-value among nodes in the open list.
+
+        Returns:
+            An integer value, or negative infinity if the open-list is
+                empty.
+        """
+        return self.g_tracker.max()
+
+    def min_f(self):
+        """Returns the least f-value among nodes in the open list.
+
+        Returns:
+            An integer value, or infinity if the open-list is empty.
+        """
+        if not self.index:
+            return inf
+        while not self.f_counts[self.min_f_idx]:
+            self.min_f_idx += 1
+        return self.min_f_idx
+
+    def max_f(self):
+        """Returns the greatest f-value among nodes in the open list.
+
+        Returns:
+            An integer value, or negative infinity if the open-list is
+                empty.
+        """
+        if not self.index:
+            return -inf
+        while not self.f_counts[-1]:
+            self.f_counts.pop()
+            self.buckets.pop()
+        return len(self.f_counts) - 1
+
+    def _discard(self, node):
+        """Removes a node known to be in the open-list from its bucket
+        and from the index.
+
+        Args:
+            node: Node object held in the open-list.
+        """
+        f, g = self._keys(node)
+        f_bucket = self.buckets[f]
+        g_bucket = f_bucket[g]
+        del g_bucket[node.state]
+        if not g_bucket:
+            del f_bucket[g]
+        self.f_counts[f] -= 1
+        del self.index[node.state]
+        self.g_tracker.remove(node.g)
+
+    def _keys(self, node):
+        """Returns the integer bucket keys (f, g) of a node.
+
+        Args:
+            node: A Node object.
+
+        Raises:
+            Exception if node has non-integer f or g.
+        """
+        f, g = int(node.f), int(node.g)
+        if f != node.f or g != node.g:
+            raise Exception("BucketOpenList requires integer f- and g-values.")
+        return f, g
+
+    def stats(self):
+        """Returns implementation-specific counters for the stats
+        output. BucketOpenList keeps none.
+
+        Returns:
+            A dict of {'stat': value}.
+        """
+        return {}
+
+    def _node_to_state(self, obj):
+        """Checks if an object is a node or a state, and returns the associated state.
+
+        Args:
+            obj: An object of type either Node or State.
+
+        Returns:
+            An object of type state, associated with obj.
+        """
+        if isinstance(obj, Node):
+            return obj.state
+        else:
+            return obj
+
+    def __repr__(self):
+        """Simple representation method for BucketOpenList"""
+        return str(list(self))
+
+    def __str__(self):
+        """String representation method for BucketOpenList. Provides
+        info on size, minimum and maximum f/g values of nodes.
+        """
+        out = f"""Size: {len(self)}
+g values: (min: {self.min_g()}, max: {self.max_g()})
+f values: (min: {self.min_f()}, max: {self.max_f()})"""
+        return out
+
+    def __len__(self):
+        """Simple len method for BucketOpenList"""
+        return len(self.index)
+
+    def __iter__(self):
+        """Iterates over every node in the open-list."""
+        return iter(self.index.values())
+
+    def __contains__(self, obj):
+        """Simple contains method for BucketOpenList. Accepts either
+        State or Node objects.
+        """
+        state = self._node_to_state(obj)
+        return state in self.index
@@ -0,0 +1,116 @@
+"""State table holding its records in a list indexed by state.
+
+For domains whose states map onto a dense range of integers, such as
+TSP states described by (visited mask, current city), a record is found
+by indexing a list rather than by hashing the state. The list is
+allocated on the first add, once the size of the state space is known
+from a state, and the table falls back to a dict if that size exceeds a
+limit.
+
+Typical usage:
+
+    table = DenseStateTable(domain.state_index, domain.n_state_indices)
+    table.add(node)
+    record = table.get(node.state)
+"""
+
+__all__ = ['DenseStateTable']
+
+from .statetable import StateTable
+
+
+class _DenseRecords:
+    """List of records indexed by state, providing the part of the dict
+    interface used by StateTable.
+
+    Attributes:
+        index: Function mapping a state to its index.
+        slots: A list holding the record of each index, or None.
+        n_records: Number of records held.
+    """
+
+    __slots__ = ('index', 'slots', 'n_records')
+
+    def __init__(self, index, size):
+        """Initializes _DenseRecords with size empty slots."""
+        self.index = index
+        self.slots = [None] * size
+        self.n_records = 0
+
+    def get(self, state, default=None):
+        record = self.slots[self.index(state)]
+        return default if record is None else record
+
+    def pop(self, state, default=None):
+        i = self.index(state)
+        record = self.slots[i]
+        if record is None:
+            return default
+        self.slots[i] = None
+        self.n_records -= 1
+        return record
+
+    def __getitem__(self, state):
+        record = self.slots[self.index(state)]
+        if record is None:
+            raise KeyError(state)
+        return record
+
+    def __setitem__(self, state, record):
+        i = self.index(state)
+        if self.slots[i] is None:
+            self.n_records += 1
+        self.slots[i] = record
+
+    def __len__(self):
+        return self.n_records
+
+
+class DenseStateTable(StateTable):
+    """StateTable whose records are held in a list indexed by state,
+    for state spaces of at most max_size states.
+
+    Attributes:
+        index: Function mapping a state to its integer index.
+        n_indices: Function mapping a state to the number of indices in
+            its state space, or None if it has no dense index.
+        max_size: Greatest number of indices for which a list is
+            allocated.
+        dense: True if the records are held in a list, False if in a
+            dict, or None before the first add.
+    """
+
+    def __init__(self, index, n_indices, max_size=2 ** 22, closedlist=None):
+        """Initializes DenseStateTable with no records.
+
+        Args:
+            index: Function mapping a state to its integer index.
+            n_indices: Function mapping a state to the number of
+                indices in its state space, or None.
+            max_size: Greatest number of indices for which a list is
+                allocated.
+            closedlist: Optional compact closed-list holding the closed
+                states.
+        """
+        super().__init__(closedlist=closedlist)
+        self.index = index
+        self.n_indices = n_indices
+        self.max_size = max_size
+        self.dense = None
+
+    def add(self, node):
+        """Records node as the best path to its state, with status
+        OPEN, allocating the list of records on the first add.
+
+        Args:
+            node: A Node object, for a state not yet in the table.
+
+        Returns:
+            The new Record.
+        """
+        if self.dense is None:
+            size = self.n_indices(node.state)
+            self.dense = size is not None and size <= self.max_size
+            if self.dense:
+                self.records = _DenseRecords(self.index, size)
+        return super().add(node)
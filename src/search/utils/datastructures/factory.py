@@ -0,0 +1,120 @@
+"""Selection of data-structure implementations from searcher settings.
+
+Typical usage:
+
+    openlist = make_openlist(search_settings)
+    states = make_statetable(search_settings, domain)
+"""
+
+__all__ = ['make_openlist', 'make_closedlist', 'make_statetable', 'openlists', 'closedlists']
+
+from .bloomclosedlist import BloomClosedList
+from .bucketopenlist import BucketOpenList
+from .densestatetable import DenseStateTable
+from .lazyopenlist import LazyOpenList
+from .openlist import OpenList
+from .rankedclosedlist import RankedClosedList
+from .statetable import StateTable
+from .tieredclosedlist import TieredClosedList
+
+openlists = {'heap': OpenList,
+             'bucket': BucketOpenList,
+             'lazy': LazyOpenList}
+
+# Searcher settings passed on to each type of open-list, if present.
+openlist_options = {'heap': ('tie_breaking',),
+                    'bucket': ('tie_breaking',),
+                    'lazy': ('tie_breaking', 'compaction_threshold')}
+
+# Compact closed-lists, keyed by name, each with the domain functions it
+# requires. 'table' keeps closed states in the state table itself.
+closedlists = {'table': (None, ()),
+               'ranked': (RankedClosedList, ('rank_state', 'n_ranks')),
+               'bloom': (BloomClosedList, ()),
+               'tiered': (TieredClosedList, ())}
+
+# Searcher settings passed on to each type of closed-list, if present, as
+# {setting: argument}.
+closedlist_options = {'bloom': {'bloom_size': 'size', 'bloom_hashes': 'n_hashes'},
+                      'tiered': {'memory_budget': 'budget', 'spill_dir': 'directory',
+                                 'max_runs': 'max_runs'}}
+
+
+def make_openlist(search_settings):
+    """Creates an empty open-list of the type named by the 'openlist'
+    searcher setting, defaulting to a binary heap. Any of the optional
+    settings listed for that type in openlist_options are passed on to
+    the open-list.
+
+    Args:
+        search_settings: A dict of settings for a single searcher, as
+            parsed from the config file.
+
+    Returns:
+        An empty open-list object.
+
+    Raises:
+        Exception if the named open-list type does not exist.
+    """
+    name = search_settings.get('openlist', 'heap')
+    if name not in openlists:
+        raise Exception(f'Unknown open-list type: {name}. Options are {list(openlists)}')
+    kwargs = {option: search_settings[option] for option in openlist_options[name]
+              if option in search_settings}
+    return openlists[name](**kwargs)
+
+
+def make_closedlist(search_settings, domain):
+    """Creates an empty compact closed-list of the type named by the
+    'closedlist' searcher setting, to be held by a StateTable. The
+    default, 'table', gives None, keeping closed states in the table.
+    Any of the optional settings listed for that type in
+    closedlist_options are passed on to the closed-list.
+
+    Args:
+        search_settings: A dict of settings for a single searcher, as
+            parsed from the config file.
+        domain: The module reference for the domain being searched.
+
+    Returns:
+        An empty closed-list object, or None.
+
+    Raises:
+        Exception if the named closed-list type does not exist, or is
+            not supported by the domain.
+    """
+    name = search_settings.get('closedlist', 'table')
+    if name not in closedlists:
+        raise Exception(f'Unknown closed-list type: {name}. Options are {list(closedlists)}')
+    closedlist_type, required = closedlists[name]
+    if closedlist_type is None:
+        return None
+    missing = [fn for fn in required if not hasattr(domain, fn)]
+    if missing:
+        raise Exception(f'Closed-list type {name} requires domain functions {missing}')
+    kwargs = {argument: search_settings[option]
+              for option, argument in closedlist_options.get(name, {}).items()
+              if option in search_settings}
+    return closedlist_type(*(getattr(domain, fn) for fn in required), **kwargs)
+
+
+def make_statetable(search_settings, domain):
+    """Creates an empty state table, holding the closed-list made by
+    make_closedlist. If the domain can index its states densely, the
+    table is a DenseStateTable, which holds its records in a list for
+    state spaces of at most 'dense_table_limit' states (default
+    2 ** 22; 0 or null for a hash table always).
+
+    Args:
+        search_settings: A dict of settings for a single searcher, as
+            parsed from the config file.
+        domain: The module reference for the domain being searched.
+
+    Returns:
+        An empty StateTable object.
+    """
+    closedlist = make_closedlist(search_settings, domain)
+    limit = search_settings.get('dense_table_limit', 2 ** 22)
+    if limit and hasattr(domain, 'state_index') and hasattr(domain, 'n_state_indices'):
+        return DenseStateTable(domain.state_index, domain.n_state_indices, max_size=limit, closedlist=closedlist)
+    return StateTable(closedlist=closedlist)
@@ -0,0 +1,217 @@
+"""Lazy-deletion open-list data structure for use in search.
+
+Typical usage:
+
+open_list = LazyOpenList(compaction_threshold=0.5)
+open_list.append(node)
+open_list.remove(node)
+print(open_list.stats())
+"""
+
+__all__ = ['LazyOpenList']
+
+import heapq
+from math import inf
+
+from .openlist import OpenList
+
+
+class LazyOpenList(OpenList):
+    """Open-list which removes and replaces nodes lazily.
+
+    Rather than deleting a superseded entry from the heap, its state is
+    pointed at the new entry in the index and the old entry is left in
+    place as a tombstone, to be skipped when it reaches the top of the
+    heap. Heap operations are then plain heapq pushes and pops. When
+    the fraction of stale entries in the heap exceeds
+    compaction_threshold, the heap is rebuilt from the live entries.
+
+    Attributes:
+        openlist: A min-heap of (f, tie-break, insertion number, node)
+            tuples, some of which may be stale.
+        index: A dict mapping each state in the open-list to its live
+            heap entry.
+        compaction_threshold: Fraction of stale entries in the heap
+            above which the heap is compacted. A value of 1 or more
+            disables compaction.
+        n_stale: Number of stale entries currently in the heap.
+        stale_pops: Number of stale entries discarded from the top of
+            the heap.
+        compactions: Number of times the heap has been compacted.
+    """
+
+    def __init__(self, tie_breaking='fifo', compaction_threshold=0.5):
+        """Initializes open-list with an empty heap.
+
+        Args:
+            tie_breaking: Name of the policy ordering nodes of equal
+                f-value, one of 'fifo', 'lifo', 'high_g' and 'low_h'.
+            compaction_threshold: Fraction of stale entries in the heap
+                above which the heap is compacted.
+        """
+        super().__init__(tie_breaking=tie_breaking)
+        self.compaction_threshold = compaction_threshold
+        self.n_stale = 0
+        self.stale_pops = 0
+        self.compactions = 0
+
+    def append(self, node):
+        """Adds a node to the openlist. If a node with the same state
+        is already present, its entry is marked stale.
+
+        Args:
+            node: Expected to be of type Node.
+        """
+        old = self.index.get(node.state)
+        if old is not None:
+            self._supersede(old)
+        entry = self._entry(node)
+        heapq.heappush(self.openlist, entry)
+        self.index[node.state] = entry
+        self._track(node)
+        if old is not None:
+            self._maybe_compact()
+
+    def pop(self):
+        """Removes and returns the highest-priority element in
+        open-list, discarding any stale entries above it.
+
+        Returns:
+            Object of type Node, with highest priority in open-list.
+        """
+        self._discard_stale()
+        node = heapq.heappop(self.openlist)[-1]
+        del self.index[node.state]
+        self._untrack(node)
+        return node
+
+    def peek(self):
+        """Returns highest-priority element in open-list without
+        removing it, discarding any stale entries above it.
+
+        Returns:
+            Object of type Node, with highest priority in open-list.
+        """
+        self._discard_stale()
+        return self.openlist[0][-1]
+
+    def get_g(self, state):
+        """Returns the g-value of a node in the open-list, as specified
+        by the node's state. If node is not found, default value of
+        infinity is returned.
+
+        Args:
+            state: State object of node requested.
+
+        Returns:
+            g-value of node associated with state, in the open list.
+        """
+        entry = self.index.get(state)
+        if entry is None:
+            return inf
+        return entry[-1].g
+
+    def get(self, state):
+        """Returns from the open-list the node associated with
+        specified state.
+
+        Args:
+            state: State object of node requested.
+
+        Returns:
+            Node object from open-list with state attribute
+                equal to state input.
+
+        Raises:
+            Exception if no node with provided state exists in open-list.
+        """
+        entry = self.index.get(state)
+        if entry is None:
+            raise Exception("Node not found.")
+        return entry[-1]
+
+    def replace(self, obj, other):
+        """Replaces a node in the open-list with a new node, leaving
+        the old entry in the heap as a tombstone.
+
+        Args:
+            obj: Object of type Node or State.
+            other: Node object, to replace obj.
+
+        Raises:
+            Exception if no node with specified state exists in
+                open-list.
+        """
+        self.remove(obj)
+        self.append(other)
+
+    def remove(self, obj):
+        """Removes a specified node from the open-list, leaving its
+        entry in the heap as a tombstone.
+
+        Args:
+            obj: Object of type Node or State.
+
+        Raises:
+            Exception if no node with specified state exists in
+                open-list.
+        """
+        state = self._node_to_state(obj)
+        entry = self.index.pop(state, None)
+        if entry is None:
+            raise Exception("Node not found.")
+        self._supersede(entry)
+        self._maybe_compact()
+
+    def stats(self):
+        """Returns counters describing the stale entries handled by
+        the open-list.
+
+        Returns:
+            A dict of {'stat': value}.
+        """
+        return {'stale_pops': self.stale_pops,
+                'stale_entries_end': self.n_stale,
+                'compactions': self.compactions}
+
+    def _supersede(self, entry):
+        """Marks a heap entry as stale, discarding its node's values
+        from the trackers.
+
+        Args:
+            entry: A heap entry which is no longer live.
+        """
+        self._untrack(entry[-1])
+        self.n_stale += 1
+
+    def _discard_stale(self):
+        """Pops stale entries from the top of the heap until the top
+        entry is live."""
+        heap, index = self.openlist, self.index
+        while heap and index.get(heap[0][-1].state) is not heap[0]:
+            heapq.heappop(heap)
+            self.n_stale -= 1
+            self.stale_pops += 1
+
+    def _maybe_compact(self):
+        """Rebuilds the heap from the live entries if the fraction of
+        stale entries exceeds compaction_threshold."""
+        if self.n_stale > self.compaction_threshold * len(self.openlist):
+            self.openlist = list(self.index.values())
+            heapq.heapify(self.openlist)
+            self.n_stale = 0
+            self.compactions += 1
+
+    def __len__(self):
+        """Returns the number of live nodes in the open-list."""
+        return len(self.index)
+
+    def __iter__(self):
+        """Iterates over the live nodes in the open-list."""
+        return (entry[-1] for entry in self.index.values())
+
+    def __getitem__(self, item):
+        """Indexes the live nodes of the open-list, in no particular
+        order.
+        """
+        return list(self)[item]
@@ -0,0 +1,116 @@
+"""Bounded cache with least-recently-used eviction.
+
+Typical usage:
+
+    cache = LRUCache(maxsize=100000)
+    value = cache.get(key)
+    if value is None:
+        value = compute(key)
+        cache.put(key, value)
+    print(cache.stats())
+"""
+
+__all__ = ['LRUCache']
+
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Mapping which holds at most maxsize entries, evicting the least
+    recently used entry when full.
+
+    Attributes:
+        maxsize: Greatest number of entries held, or None for no limit.
+        cache: An OrderedDict of entries, least recently used first.
+        hits: Number of lookups which found an entry.
+        misses: Number of lookups which found none.
+        evictions: Number of entries evicted.
+    """
+
+    def __init__(self, maxsize=100000):
+        """Initializes LRUCache with no entries.
+
+        Args:
+            maxsize: Greatest number of entries held, or None for no
+                limit.
+
+        Raises:
+            Exception if maxsize is not positive.
+        """
+        if maxsize is not None and maxsize < 1:
+            raise Exception('LRUCache requires a positive maxsize.')
+        self.maxsize = maxsize
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Returns the value held for key, marking it as most recently
+        used, or default if there is none.
+
+        Args:
+            key: A hashable object.
+            default: Value returned on a miss.
+        """
+        try:
+            value = self.cache[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.cache.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key, default=None):
+        """Returns the value held for key, or default if there is none,
+        without marking it as used or counting the lookup.
+
+        Args:
+            key: A hashable object.
+            default: Value returned if key is not held.
+        """
+        return self.cache.get(key, default)
+
+    def put(self, key, value):
+        """Holds value for key as the most recently used entry,
+        evicting the least recently used entry if the cache is full.
+
+        Args:
+            key: A hashable object.
+            value: Object to hold for key.
+        """
+        self.cache[key] = value
+        self.cache.move_to_end(key)
+        if self.maxsize is not None and len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+
+    def reset_stats(self):
+        """Zeroes the hit, miss and eviction counters, keeping the
+        entries."""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        """Returns the lookup and eviction counters of the cache.
+
+        Returns:
+            A dict of {'stat': value}.
+        """
+        lookups = self.hits + self.misses
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'size': len(self.cache)}
+
+    def __len__(self):
+        """Returns the number of entries in the cache."""
+        return len(self.cache)
+
+    def __contains__(self, key):
+        """Returns True if the cache holds a value for key, without
+        marking it as used."""
+        return key in self.cache
@@ -12,6 +12,9 @@ __all__ = ['Node']
 class Node:
     """Node class for use in search.
 
+    Uses __slots__ rather than a per-instance __dict__, as searches
+    hold millions of nodes.
+
     Attributes:
         state: An immutable object representing the state of the node.
         g: Cost of path leading from start -> current state.
@@ -20,26 +23,35 @@ class Node:
         direction: Primarily for use in bidirectional search. Describes
             direction in which node was generated.
         parent: Node which precedes this node in path.
-        action: Action used to get from parent to current node.
-        depth: Number of steps in path to node.
+        G: For partial expansion, the g-value of the next child to be
+            generated, or None once every child has been generated.
+        n_expanded: Number of children generated so far.
+        expanded_nonce: Whether the node has been counted as starting
+            expansion.
         """
 
-    def __init__(self, state, g, h=0, direction=1, parent=None, action=None):
+    __slots__ = ('state', 'g', 'h', 'f', 'G', 'direction', 'parent', 'n_expanded', 'expanded_nonce')
+
+    def __init__(self, state, g, h=0, direction=1, parent=None):
         """Initializes Node object."""
         self.state = state
         self.g = g
         self.h = h
         self.f = g + h
-        self.G = self.g
-        self.F = self.f
+        self.G = g
         self.direction = direction
         self.parent = parent
-        self.action = action
-        self.depth = parent.depth + 1 if parent else 0
         self.n_expanded = 0
-        self.expanded_once = False
         self.expanded_nonce = False
 
+    @property
+    def depth(self):
+        """Number of steps in path to node."""
+        node, depth = self.parent, 0
+        while node:
+            node, depth = node.parent, depth + 1
+        return depth
+
     def expand(self, problem, partial_expansion=False, gen_limit=None):
         """Expands node, to give all directly reachable children.
 
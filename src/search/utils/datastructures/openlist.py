@@ -8,37 +8,88 @@ for node in open_list:
     print(node)
 """
 
-__all__ = ['OpenList']
+__all__ = ['OpenList', 'tie_breakers']
 
+from itertools import count
 from math import inf
-import heapq
 
 from .node import Node
+from .valuetracker import ValueTracker
+
+# Secondary sort keys for nodes of equal f-value, each a function of
+# the node and its insertion number.
+tie_breakers = {'fifo': lambda node, n: n,
+                'lifo': lambda node, n: -n,
+                'high_g': lambda node, n: -node.g,
+                'low_h': lambda node, n: node.h}
 
 
 class OpenList:
     """Open-list data structure.
 
+    Backed by a binary min-heap together with an index mapping each
+    state to its position in the heap, so that membership tests and
+    g-value lookups are O(1), and replacement (decrease-key) and
+    removal of arbitrary nodes are O(log n). Only one node per state
+    is held at any time.
+
+    Heap entries are tuples (f, tie-break, insertion number, node),
+    built once on insertion so that the heap compares tuples rather
+    than calling Node comparison methods. The tie-break key orders
+    nodes of equal f-value according to the chosen policy, and the
+    insertion number makes every key unique.
+
     Attributes:
-        openlist: A min-heap intended to contain state objects.
-        g_tracker: A min-heap storing the different g-values in the
-            open-list
+        openlist: A min-heap of (f, tie-break, insertion number, node)
+            tuples.
+        index: A dict mapping each state in the open-list to the
+            position of its entry in openlist.
+        tie_breaker: Function giving the tie-break key of a node.
+        g_tracker: A ValueTracker counting the g-values in the
+            open-list.
+        f_tracker: A ValueTracker counting the f-values in the
+            open-list.
+        fg_index: A dict mapping f-value to a dict mapping g-value to
+            a dict of {state: node}, for range queries over (f, g).
     """
 
-    def __init__(self):
-        """Initializes open-list with an empty list."""
+    def __init__(self, tie_breaking='fifo'):
+        """Initializes open-list with an empty list.
+
+        Args:
+            tie_breaking: Name of the policy ordering nodes of equal
+                f-value, one of 'fifo', 'lifo', 'high_g' and 'low_h'.
+
+        Raises:
+            Exception if tie_breaking is not a known policy.
+        """
+        if tie_breaking not in tie_breakers:
+            raise Exception(f'Unknown tie-breaking policy: {tie_breaking}. Options are {list(tie_breakers)}')
+        self.tie_breaker = tie_breakers[tie_breaking]
+        self._counter = count()
         self.openlist = []
-        self.g_tracker = []
+        self.index = {}
+        self.g_tracker = ValueTracker()
+        self.f_tracker = ValueTracker()
+        self.fg_index = {}
 
     def append(self, node):
-        """Adds a node to the openlist. Updates the g_tracker
-        attribute to account for the new node's g-value.
+        """Adds a node to the openlist. Updates the g_tracker and
+        f_tracker attributes to account for the new node's values.
+
+        If a node with the same state is already present, it is
+        replaced by node.
 
         Args:
             node: Expected to be of type Node.
         """
-        heapq.heappush(self.openlist, node)
-        heapq.heappush(self.g_tracker, node.g)
+        if node.state in self.index:
+            self.replace(node.state, node)
+            return
+        self.openlist.append(self._entry(node))
+        self.index[node.state] = len(self.openlist) - 1
+        self._sift_up(len(self.openlist) - 1)
+        self._track(node)
 
     def pop(self):
         """Removes and returns the highest-priority element in
@@ -47,9 +98,9 @@ class OpenList:
         Returns:
             Object of type Node, with highest priority in open-list.
         """
-        out = heapq.heappop(self.openlist)
-        self.g_tracker.remove(out.g)
-        heapq.heapify(self.g_tracker)
+        out = self.openlist[0][-1]
+        self._delete(0)
+        self._untrack(out)
         return out
 
     def peek(self):
@@ -59,7 +110,7 @@ class OpenList:
         Returns:
             Object of type Node, with highest priority in open-list.
         """
-        return self.openlist[0]
+        return self.openlist[0][-1]
 
     def get_g(self, state):
         """Returns the g-value of a node in the open-list, as specified
@@ -72,10 +123,10 @@ class OpenList:
         Returns:
             g-value of node associated with state, in the open list.
         """
-        for other in self.openlist:
-            if other.state == state:
-                return other.g
-        return inf
+        i = self.index.get(state)
+        if i is None:
+            return inf
+        return self.openlist[i][-1].g
 
     def get(self, state):
         """Returns from the open-list the node associated with
@@ -91,13 +142,14 @@ class OpenList:
         Raises:
             Exception if no node with provided state exists in open-list.
         """
-        for other in self.openlist:
-            if other.state == state:
-                return other
-        raise Exception("Node not found.")
+        i = self.index.get(state)
+        if i is None:
+            raise Exception("Node not found.")
+        return self.openlist[i][-1]
 
     def replace(self, obj, other):
-        """Replaces a node in the open-list with a new node.
+        """Replaces a node in the open-list with a new node, restoring
+        the heap property in O(log n).
 
         Args:
             obj: Object of type Node or State.
@@ -108,16 +160,18 @@ class OpenList:
                 open-list.
         """
         state = self._node_to_state(obj)
-        for i, x in enumerate(self.openlist):
-            if x.state == state:
-                self.g_tracker.remove(x.g)
-                heapq.heapify(self.g_tracker)
-                self.openlist[i] = other
-                break
-        else:
+        i = self.index.pop(state, None)
+        if i is None:
             raise Exception("Node not found.")
-        heapq.heappush(self.g_tracker, other.g)
-
+        old = self.openlist[i]
+        self._untrack(old[-1])
+        entry = self.openlist[i] = self._entry(other)
+        self.index[other.state] = i
+        if entry < old:
+            self._sift_up(i)
+        else:
+            self._sift_down(i)
+        self._track(other)
 
     def remove(self, obj):
         """Removes a specified node from the open-list.
@@ -130,25 +184,180 @@ class OpenList:
                 open-list.
         """
         state = self._node_to_state(obj)
-        for i, x in enumerate(self.openlist):
-            if x.state == state:
-                self.g_tracker.remove(x.g)
-                heapq.heapify(self.g_tracker)
-                break
-        else:
+        i = self.index.get(state)
+        if i is None:
             raise Exception("Node not found.")
-        self.openlist.pop(i)
-        heapq.heapify(self.openlist)
+        self._untrack(self.openlist[i][-1])
+        self._delete(i)
+
+    def expandable(self, f_lim, g_lim, since=None):
+        """Yields every node with f <= f_lim and g < g_lim, visiting
+        only the (f, g) cells of fg_index within those limits.
+
+        If since is given as a previous pair of limits (f_since,
+        g_since), nodes which already fell within those limits are
+        skipped, so only newly expandable nodes are yielded.
+
+        Args:
+            f_lim: Inclusive upper limit on f-value.
+            g_lim: Exclusive upper limit on g-value.
+            since: Optional tuple (f_since, g_since) of earlier limits.
+
+        Returns:
+            A generator of Node objects.
+        """
+        f_since, g_since = since if since is not None else (-inf, -inf)
+        for f, g_cells in self.fg_index.items():
+            if f > f_lim:
+                continue
+            for g, cell in g_cells.items():
+                if g < g_lim and (f > f_since or g >= g_since):
+                    yield from cell.values()
 
     def min_g(self):
         """Returns the least g-value among nodes in the open list.
 
         Returns:
-            An integer value.
+            An integer value, or infinity if the open-list is empty.
         """
-        out = heapq.heappop(self.g_tracker)
-        heapq.heappush(self.g_tracker, out)
-        return out
+        return self.g_tracker.min()
+
+    def max_g(self):
+        """Returns the greatest g-value among nodes in the open list.
+
+        Returns:
+            An integer value, or negative infinity if the open-list is
+                empty.
+        """
+        return self.g_tracker.max()
+
+    def min_f(self):
+        """Returns the least f-value among nodes in the open list.
+
+        Returns:
+            An integer value, or infinity if the open-list is empty.
+        """
+        return self.f_tracker.min()
+
+    def max_f(self):
+        """Returns the greatest f-value among nodes in the open list.
+
+        Returns:
+            An integer value, or negative infinity if the open-list is
+                empty.
+        """
+        return self.f_tracker.max()
+
+    def _track(self, node):
+        """Records the g- and f-values of a node entering the
+        open-list."""
+        self.g_tracker.add(node.g)
+        self.f_tracker.add(node.f)
+        g_cells = self.fg_index.get(node.f)
+        if g_cells is None:
+            g_cells = self.fg_index[node.f] = {}
+        cell = g_cells.get(node.g)
+        if cell is None:
+            cell = g_cells[node.g] = {}
+        cell[node.state] = node
+
+    def _untrack(self, node):
+        """Discards the g- and f-values of a node leaving the
+        open-list."""
+        self.g_tracker.remove(node.g)
+        self.f_tracker.remove(node.f)
+        g_cells = self.fg_index[node.f]
+        cell = g_cells[node.g]
+        del cell[node.state]
+        if not cell:
+            del g_cells[node.g]
+            if not g_cells:
+                del self.fg_index[node.f]
+
+    def _entry(self, node):
+        """Builds the heap entry for a node.
+
+        Args:
+            node: A Node object.
+
+        Returns:
+            A tuple (f, tie-break, insertion number, node).
+        """
+        n = next(self._counter)
+        return node.f, self.tie_breaker(node, n), n, node
+
+    def _delete(self, i):
+        """Removes the entry at position i of the heap, moving the last
+        entry into its place and restoring the heap property.
+
+        Args:
+            i: Position in openlist of the entry to remove.
+        """
+        heap = self.openlist
+        removed = heap[i]
+        del self.index[removed[-1].state]
+        last = heap.pop()
+        if i < len(heap):
+            heap[i] = last
+            self.index[last[-1].state] = i
+            if last < removed:
+                self._sift_up(i)
+            else:
+                self._sift_down(i)
+
+    def _sift_up(self, pos):
+        """Moves the entry at pos towards the root of the heap until
+        its parent has no greater priority, keeping index up to date.
+
+        Args:
+            pos: Position in openlist of the entry to move.
+        """
+        heap, index = self.openlist, self.index
+        entry = heap[pos]
+        while pos > 0:
+            parent_pos = (pos - 1) >> 1
+            parent = heap[parent_pos]
+            if not entry < parent:
+                break
+            heap[pos] = parent
+            index[parent[-1].state] = pos
+            pos = parent_pos
+        heap[pos] = entry
+        index[entry[-1].state] = pos
+
+    def _sift_down(self, pos):
+        """Moves the entry at pos towards the leaves of the heap until
+        neither child has greater priority, keeping index up to date.
+
+        Args:
+            pos: Position in openlist of the entry to move.
+        """
+        heap, index = self.openlist, self.index
+        end = len(heap)
+        entry = heap[pos]
+        child_pos = 2 * pos + 1
+        while child_pos < end:
+            right_pos = child_pos + 1
+            if right_pos < end and heap[right_pos] < heap[child_pos]:
+                child_pos = right_pos
+            child = heap[child_pos]
+            if not child < entry:
+                break
+            heap[pos] = child
+            index[child[-1].state] = pos
+            pos = child_pos
+            child_pos = 2 * pos + 1
+        heap[pos] = entry
+        index[entry[-1].state] = pos
+
+    def stats(self):
+        """Returns implementation-specific counters for the stats
+        output. OpenList keeps none.
+
+        Returns:
+            A dict of {'stat': value}.
+        """
+        return {}
 
     def _node_to_state(self, obj):
         """Checks if an object is a node or a state, and returns the associated state.
@@ -166,15 +375,15 @@ class OpenList:
 
     def __repr__(self):
         """Simple representation method for OpenList"""
-        return str(self.openlist)
+        return str(self[:])
 
     def __str__(self):
         """String representation method for OpenList. Provides info
         on size, minimum and maximum f/g values of nodes.
         """
         out = f"""Size: {len(self.openlist)}
-g values: (min: {self.min_g}, max: {self.max_g})
-f values: (min: {self.min_f}, max: {self.max_f})"""
+g values: (min: {self.min_g()}, max: {self.max_g()})
+f values: (min: {self.min_f()}, max: {self.max_f()})"""
         return out
 
     def __len__(self):
@@ -185,11 +394,13 @@ f values: (min: {self.min_f}, max: {self.max_f})"""
         """Simple getitem method for OpenList, allows for iteration
         and indexing.
         """
-        return self.openlist[item]
+        if isinstance(item, slice):
+            return [entry[-1] for entry in self.openlist[item]]
+        return self.openlist[item][-1]
 
     def __contains__(self, obj):
         """Simple contains method for OpenList. Accepts either State or
         Node objects.
         """
         state = self._node_to_state(obj)
-        return any(other.state == state for other in self.openlist)
+        return state in self.index
@@ -1,5 +1,12 @@
 from collections import namedtuple
 
-Problem = namedtuple('Problem', 'initial goal epsilon statics', defaults=(1, []))
+# intern: optional dict mapping each state of the problem to its single
+# shared instance, so that equal states generated in either direction and
+# by any searcher are the same object (see helpers.pancake.intern_state).
+#
+# successor_cache: optional LRUCache holding the successors of recently
+# expanded states, in place of the list otherwise kept by each state.
+Problem = namedtuple('Problem', 'initial goal epsilon statics intern successor_cache',
+                     defaults=(1, [], None, None))
 
 # Problem.__defaults__ = (1, [])
\ No newline at end of file
@@ -0,0 +1,126 @@
+"""Closed-list backed by a bit array indexed by state rank.
+
+For domains whose states can be ranked into a dense range of integers,
+membership of the closed-list takes one bit per state of the state
+space, rather than a hashed state object per closed state.
+
+Typical usage:
+
+    closed_list = RankedClosedList(domain.rank_state, domain.n_ranks)
+    closed_list.append(node)
+    if node.state in closed_list:
+        print(closed_list.stats())
+"""
+
+__all__ = ['RankedClosedList']
+
+from .node import Node
+
+
+class RankedClosedList:
+    """Closed-list storing one bit per rank of the state space.
+
+    The bit array is allocated on the first append, once the size of
+    the state space is known from a state.
+
+    Attributes:
+        rank: Function mapping a state to its integer rank.
+        n_ranks: Function mapping a state to the number of ranks in
+            its state space.
+        bits: A bytearray holding one bit per rank, or None before the
+            first append.
+        n_closed: Number of ranks set.
+    """
+
+    def __init__(self, rank, n_ranks):
+        """Initializes RankedClosedList with no bit array.
+
+        Args:
+            rank: Function mapping a state to its integer rank.
+            n_ranks: Function mapping a state to the number of ranks in
+                its state space.
+        """
+        self.rank = rank
+        self.n_ranks = n_ranks
+        self.bits = None
+        self.n_closed = 0
+
+    def append(self, node):
+        """Adds a node's state to the closed-list.
+
+        Args:
+            node: A node object.
+        """
+        if self.bits is None:
+            self.bits = bytearray((self.n_ranks(node.state) + 7) // 8)
+        r = self.rank(node.state)
+        mask = 1 << (r & 7)
+        if not self.bits[r >> 3] & mask:
+            self.bits[r >> 3] |= mask
+            self.n_closed += 1
+
+    def remove(self, obj):
+        """Removes the state associated with a specified object from
+        the closed-list.
+
+        Args:
+            obj: An object of type either Node or State.
+
+        Raises:
+            KeyError if the state is not in the closed-list.
+        """
+        state = self._node_to_state(obj)
+        if state not in self:
+            raise KeyError(state)
+        r = self.rank(state)
+        self.bits[r >> 3] &= ~(1 << (r & 7)) & 0xff
+        self.n_closed -= 1
+
+    def stats(self):
+        """Returns the memory held by the bit array.
+
+        Returns:
+            A dict of {'stat': value}.
+        """
+        return {'bytes': len(self.bits) if self.bits is not None else 0}
+
+    def _node_to_state(self, obj):
+        """Checks if an object is a node or a state, and returns the associated state.
+
+        Args:
+            obj: An object of type either Node or State.
+
+        Returns:
+            An object of type state, associated with obj.
+        """
+        if isinstance(obj, Node):
+            return obj.state
+        else:
+            return obj
+
+    def __len__(self):
+        """Returns the number of states in the closed-list."""
+        return self.n_closed
+
+    def __contains__(self, obj):
+        """Returns True if the state associated with obj is in the
+        closed-list.
+
+        Args:
+            obj: An object of type either Node or State.
+        """
+        if self.bits is None:
+            return False
+        r = self.rank(self._node_to_state(obj))
+        return bool(self.bits[r >> 3] & (1 << (r & 7)))
+
+    def __iter__(self):
+        """Iterates over the ranks in the closed-list, in increasing
+        order. States are not stored, so ranks are yielded instead."""
+        if self.bits is None:
+            return
+        for i, byte in enumerate(self.bits):
+            while byte:
+                low = byte & -byte
+                yield (i << 3) + low.bit_length() - 1
+                byte ^= low
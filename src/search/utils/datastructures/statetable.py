@@ -0,0 +1,217 @@
+"""State table for duplicate detection in search.
+
+Holds one record per generated state, so that a searcher can decide
+whether a generated child is new, a cheaper path to an open state, or
+already closed with a single lookup.
+
+Typical usage:
+
+    table = StateTable()
+    table.add(node)
+    record = table.get(node.state)
+    if record is not None and record.status == CLOSED:
+        print(record.g)
+
+A compact closed-list may be given to the table, in which case the
+records of closed states are dropped and only their membership of the
+closed-list is kept.
+"""
+
+__all__ = ['StateTable', 'Record', 'OPEN', 'CLOSED']
+
+from math import inf
+
+OPEN = 'open'
+CLOSED = 'closed'
+
+
+class Record:
+    """Record of the best known path to a state.
+
+    Attributes:
+        g: Best g-value found for the state.
+        status: OPEN if the state's node is in the open-list, CLOSED if
+            it has been expanded.
+        node: The node holding the best path to the state, which is
+            also its handle in the open-list.
+    """
+
+    __slots__ = ('g', 'status', 'node')
+
+    def __init__(self, node, status=OPEN):
+        """Initializes Record from a node."""
+        self.g = node.g
+        self.status = status
+        self.node = node
+
+    @property
+    def parent(self):
+        """Parent node on the best known path to the state."""
+        return self.node.parent
+
+    def __repr__(self):
+        """Gives representation of record."""
+        return f'Record(g={self.g}, status={self.status}, node={self.node})'
+
+
+class _ClosedRecord(Record):
+    """Record standing in for a state held only by a compact
+    closed-list. Its g-value and node are not kept, so it must not be
+    updated."""
+
+    def __init__(self):
+        """Initializes _ClosedRecord with no node."""
+        self.g = -inf
+        self.status = CLOSED
+        self.node = None
+
+
+class StateTable:
+    """Hash table mapping each generated state to its Record.
+
+    Attributes:
+        records: A dict mapping states to Record objects.
+        n_closed: Number of states with status CLOSED.
+        closedlist: Optional compact closed-list (such as a
+            RankedClosedList) to which closed states are moved out of
+            records. Closed states cannot then be reopened.
+    """
+
+    _closed_record = _ClosedRecord()
+
+    def __init__(self, closedlist=None):
+        """Initializes StateTable with no records.
+
+        Args:
+            closedlist: Optional compact closed-list holding the closed
+                states.
+        """
+        self.records = {}
+        self.n_closed = 0
+        self.closedlist = closedlist
+
+    def get(self, state):
+        """Returns the record of a state, or None if it has not been
+        generated.
+
+        States held by the compact closed-list, if any, share a single
+        CLOSED record with no g-value or node.
+
+        Args:
+            state: A state object.
+        """
+        record = self.records.get(state)
+        if record is None and self.closedlist is not None and state in self.closedlist:
+            return self._closed_record
+        return record
+
+    def add(self, node):
+        """Records node as the best path to its state, with status
+        OPEN.
+
+        Args:
+            node: A Node object, for a state not yet in the table.
+
+        Returns:
+            The new Record.
+        """
+        record = self.records[node.state] = Record(node)
+        return record
+
+    def update(self, record, node):
+        """Replaces the node held by a record with a cheaper one, and
+        reopens the record if it was closed.
+
+        Args:
+            record: A Record held by the table.
+            node: A Node object for the same state as record.
+        """
+        if record.status == CLOSED:
+            record.status = OPEN
+            self.n_closed -= 1
+        record.g = node.g
+        record.node = node
+
+    def close(self, node):
+        """Marks the record of a node's state as CLOSED.
+
+        If the table has a compact closed-list, the record is dropped
+        and the state is added to the closed-list instead.
+
+        Args:
+            node: A Node object whose state is in the table.
+        """
+        if self.closedlist is not None:
+            if self.records.pop(node.state, None) is not None:
+                self.closedlist.append(node)
+                self.n_closed += 1
+            return
+        record = self.records[node.state]
+        if record.status != CLOSED:
+            record.status = CLOSED
+            self.n_closed += 1
+
+    def open_children(self, children, batch_heuristic=None):
+        """Yields those children of an expansion which are not closed
+        and improve on any open g-value in the table.
+
+        If there is a batch heuristic, the heuristic values of all the
+        children yielded are given by one call to it, once the
+        expansion is exhausted. Otherwise the children are yielded as
+        they are generated, without heuristic values.
+
+        Args:
+            children: An iterable of tuples whose first two items are
+                the state and g-value of a child, as given by a node's
+                expansion. Any further items are passed through.
+            batch_heuristic: Optional callable hs(states) giving the
+                heuristic values of a list of states.
+
+        Returns:
+            A generator of (state, g, record, h, ...) tuples, where
+                record is the child's Record or None, and h is its
+                heuristic value or None.
+        """
+        pending = []
+        for child in children:
+            state, g = child[0], child[1]
+            record = self.get(state)
+            if record is not None and (record.status == CLOSED or g >= record.g):
+                continue
+            if batch_heuristic is None:
+                yield (state, g, record, None, *child[2:])
+            else:
+                pending.append((child, record))
+        if pending:
+            hs = batch_heuristic([child[0] for child, _ in pending])
+            for (child, record), h in zip(pending, hs):
+                yield (child[0], child[1], record, h, *child[2:])
+
+    def release(self):
+        """Releases the resources held by the compact closed-list, if
+        it has any, such as the runs of a TieredClosedList on disk.
+        The table should not be searched afterwards."""
+        close = getattr(self.closedlist, 'close', None)
+        if close is not None:
+            close()
+
+    def stats(self):
+        """Returns implementation-specific counters of the compact
+        closed-list for the stats output, if there is one.
+
+        Returns:
+            A dict of {'stat': value}.
+        """
+        if self.closedlist is None:
+            return {}
+        return self.closedlist.stats()
+
+    def __len__(self):
+        """Returns the number of states in the table."""
+        if self.closedlist is not None:
+            return len(self.records) + self.n_closed
+        return len(self.records)
+
+    def __contains__(self, state):
+        """Returns True if state has been generated."""
+        return self.get(state) is not None
@@ -0,0 +1,252 @@
+"""Closed-list which spills to disk once a memory budget is reached.
+
+Recently closed states are held in memory. When their number reaches
+the budget they are written out as a sorted run of fixed-size digests
+to a file, which is memory-mapped and searched by bisection. Runs are
+merged once there are more than max_runs of them, so that a lookup
+probes a bounded number of files.
+
+Typical usage:
+
+    closed_list = TieredClosedList(budget=1000000)
+    closed_list.append(node)
+    if node.state in closed_list:
+        print(closed_list.stats())
+"""
+
+__all__ = ['TieredClosedList']
+
+import hashlib
+import heapq
+import mmap
+import os
+import tempfile
+
+from .node import Node
+
+DIGEST_SIZE = 16
+
+
+def _digest(state):
+    """Returns a fixed-size digest of a state, stable across processes.
+
+    Args:
+        state: A state object with a deterministic repr.
+    """
+    return hashlib.blake2b(repr(state).encode(), digest_size=DIGEST_SIZE).digest()
+
+
+class _Run:
+    """A sorted run of digests in a memory-mapped file.
+
+    Attributes:
+        path: Path of the file holding the run.
+        count: Number of digests in the run.
+        map: Read-only mmap of the file.
+    """
+
+    def __init__(self, path, digests):
+        """Writes digests, which must be sorted and distinct, to path
+        and maps the file into memory."""
+        self.path = path
+        self.count = 0
+        with open(path, 'wb') as f:
+            for d in digests:
+                f.write(d)
+                self.count += 1
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __contains__(self, digest):
+        """Returns True if digest is in the run, by bisection."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            d = self.map[mid * DIGEST_SIZE:(mid + 1) * DIGEST_SIZE]
+            if d < digest:
+                lo = mid + 1
+            elif d > digest:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def __iter__(self):
+        """Iterates over the digests of the run in sorted order."""
+        for i in range(self.count):
+            yield self.map[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE]
+
+    def close(self):
+        """Unmaps the run and deletes its file."""
+        self.map.close()
+        os.remove(self.path)
+
+
+class TieredClosedList:
+    """Closed-list holding up to budget states in memory, and the rest
+    as sorted runs of digests on disk.
+
+    Spilled states are identified by a 16-byte digest of their repr, so
+    two distinct states are confused only on a digest collision.
+
+    Attributes:
+        budget: Number of states held in memory before spilling.
+        max_runs: Number of runs on disk above which they are merged.
+        directory: Directory holding the runs, created if it does not
+            exist. A temporary directory, removed by close(), is used if
+            none is given, and directory is None again once it has been
+            removed.
+        hot: A set of the states closed since the last spill.
+        runs: A list of the _Run objects on disk.
+        n_closed: Number of states in the closed-list.
+        spills: Number of times the in-memory states have been spilled.
+        closed: True once close() has been called, after which the
+            in-memory states can no longer be spilled.
+    """
+
+    def __init__(self, budget=1000000, directory=None, max_runs=8):
+        """Initializes TieredClosedList with no states.
+
+        Args:
+            budget: Number of states held in memory before spilling.
+            directory: Directory in which to create the runs.
+            max_runs: Number of runs on disk above which they are
+                merged.
+
+        Raises:
+            Exception if budget or max_runs is not positive.
+        """
+        if budget < 1 or max_runs < 1:
+            raise Exception('TieredClosedList requires a positive budget and max_runs.')
+        self.budget = budget
+        self.max_runs = max_runs
+        self._tempdir = None
+        self.directory = directory
+        self.hot = set()
+        self.runs = []
+        self.n_closed = 0
+        self.spills = 0
+        self.closed = False
+
+    def append(self, node):
+        """Adds a node's state to the closed-list, spilling the
+        in-memory states to disk if the budget is reached.
+
+        Args:
+            node: A node object.
+
+        Raises:
+            Exception if the budget is reached after close().
+        """
+        if node.state in self:
+            return
+        self.hot.add(node.state)
+        self.n_closed += 1
+        if len(self.hot) >= self.budget:
+            self._spill()
+
+    def remove(self, obj):
+        """Removes the state associated with a specified object from
+        the in-memory part of the closed-list.
+
+        Args:
+            obj: An object of type either Node or State.
+
+        Raises:
+            Exception if the state has been spilled to disk.
+            KeyError if the state is not in the closed-list.
+        """
+        state = self._node_to_state(obj)
+        if state in self.hot:
+            self.hot.remove(state)
+            self.n_closed -= 1
+        elif state in self:
+            raise Exception('Cannot remove a state spilled to disk.')
+        else:
+            raise KeyError(state)
+
+    def stats(self):
+        """Returns the number of states held in memory and on disk.
+
+        Returns:
+            A dict of {'stat': value}.
+        """
+        return {'in_memory': len(self.hot),
+                'on_disk': sum(run.count for run in self.runs),
+                'spills': self.spills,
+                'runs': len(self.runs)}
+
+    def close(self):
+        """Deletes the runs on disk, and the temporary directory if one
+        was created. The in-memory states are kept, but no more states
+        can be spilled."""
+        for run in self.runs:
+            run.close()
+        self.runs = []
+        if self._tempdir is not None:
+            self._tempdir.cleanup()
+            self._tempdir = None
+            self.directory = None
+        self.closed = True
+
+    def _spill(self):
+        """Writes the in-memory states to disk as a new sorted run,
+        merging the runs if there are more than max_runs.
+
+        Raises:
+            Exception if the closed-list has been closed.
+        """
+        if self.closed:
+            raise Exception('Cannot spill a TieredClosedList after close(), as its runs have been deleted.')
+        self.runs.append(_Run(self._new_path(), sorted(_digest(s) for s in self.hot)))
+        self.hot = set()
+        self.spills += 1
+        if len(self.runs) > self.max_runs:
+            merged = _Run(self._new_path(), heapq.merge(*self.runs))
+            for run in self.runs:
+                run.close()
+            self.runs = [merged]
+
+    def _new_path(self):
+        """Creates a new, empty run file with a unique name, and
+        returns its path."""
+        if self.directory is None:
+            self._tempdir = tempfile.TemporaryDirectory(prefix='closedlist-')
+            self.directory = self._tempdir.name
+        os.makedirs(self.directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix='run-', suffix='.bin', dir=self.directory)
+        os.close(fd)
+        return path
+
+    def _node_to_state(self, obj):
+        """Checks if an object is a node or a state, and returns the associated state.
+
+        Args:
+            obj: An object of type either Node or State.
+
+        Returns:
+            An object of type state, associated with obj.
+        """
+        if isinstance(obj, Node):
+            return obj.state
+        else:
+            return obj
+
+    def __len__(self):
+        """Returns the number of states in the closed-list."""
+        return self.n_closed
+
+    def __contains__(self, obj):
+        """Returns True if the state associated with obj is in the
+        closed-list, checking memory before the runs on disk.
+
+        Args:
+            obj: An object of type either Node or State.
+        """
+        state = self._node_to_state(obj)
+        if state in self.hot:
+            return True
+        if not self.runs:
+            return False
+        digest = _digest(state)
+        return any(digest in run for run in self.runs)
@@ -0,0 +1,104 @@
+"""Counted multiset of values, for tracking g- and f-values in search.
+
+Typical usage:
+
+    tracker = ValueTracker()
+    tracker.add(5)
+    tracker.add(3)
+    tracker.remove(3)
+    print(tracker.min())
+      >> 5
+"""
+
+__all__ = ['ValueTracker']
+
+import heapq
+from math import inf
+
+
+class ValueTracker:
+    """Multiset of numeric values supporting O(1) deletion, O(log d)
+    insertion of a new distinct value (O(1) for a value already held),
+    and amortised O(log d) minimum/maximum queries, for d distinct
+    values.
+
+    Each distinct value is stored once alongside a count, and pushed
+    onto a min-heap and a max-heap when first added. Values removed
+    from counts are deleted from the heaps lazily, when they reach the
+    top. The heaps are rebuilt from counts once they hold more than
+    twice as many entries as there are distinct values, so that values
+    removed below the top do not accumulate.
+
+    Attributes:
+        counts: A dict mapping each distinct value to its number of
+            occurrences.
+    """
+
+    def __init__(self):
+        """Initializes ValueTracker with no values."""
+        self.counts = {}
+        self._low = []
+        self._high = []
+
+    def add(self, value):
+        """Adds one occurrence of value.
+
+        Args:
+            value: A numeric value.
+        """
+        counts = self.counts
+        count = counts.get(value, 0)
+        counts[value] = count + 1
+        if count:
+            return
+        if len(self._low) > 2 * len(counts) + 16:
+            self._rebuild()
+        else:
+            heapq.heappush(self._low, value)
+            heapq.heappush(self._high, -value)
+
+    def remove(self, value):
+        """Removes one occurrence of value.
+
+        Args:
+            value: A numeric value.
+
+        Raises:
+            KeyError if value is not present.
+        """
+        counts = self.counts
+        count = counts[value] - 1
+        if count:
+            counts[value] = count
+        else:
+            del counts[value]
+
+    def min(self):
+        """Returns the least value held, or infinity if empty."""
+        low, counts = self._low, self.counts
+        while low and low[0] not in counts:
+            heapq.heappop(low)
+        return low[0] if low else inf
+
+    def max(self):
+        """Returns the greatest value held, or negative infinity if
+        empty."""
+        high, counts = self._high, self.counts
+        while high and -high[0] not in counts:
+            heapq.heappop(high)
+        return -high[0] if high else -inf
+
+    def _rebuild(self):
+        """Rebuilds both heaps from the distinct values held."""
+        self._low = list(self.counts)
+        heapq.heapify(self._low)
+        self._high = [-value for value in self.counts]
+        heapq.heapify(self._high)
+
+    def __len__(self):
+        """Returns the number of distinct values held."""
+        return len(self.counts)
+
+    def __contains__(self, value):
+        """Returns True if at least one occurrence of value is held."""
+        return value in self.counts
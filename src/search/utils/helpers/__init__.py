@@ -1,5 +1,7 @@
+from .heuristic import *
 from .parser import *
 from .writer import *
 
-__all__ = (parser.__all__
-           + writer.__all__)
\ No newline at end of file
+__all__ = (heuristic.__all__
+           + parser.__all__
+           + writer.__all__)
@@ -0,0 +1,332 @@
+"""Heuristic objects which build their goal-derived tables once per
+problem.
+
+A heuristic is prepared for a problem, a degradation and a goal, and
+returns a callable h(state, parent=None). Tables derived from the goal
+(positions, adjacencies, edge weights) are built on the first
+preparation for a problem and reused by every later preparation for the
+same problem and goal, so that all searchers and degradation levels run
+on a problem share them.
+
+A heuristic may also have a batch form, which evaluates a whole list of
+states (such as the children of an expansion) in one vectorized call.
+
+A heuristic may be wrapped in a CachedHeuristic, which memoizes its
+values per problem in a bounded LRU cache, shared by every searcher and
+degradation run on the problem. Heuristics with a profile form (such as
+the per-position gaps of the pancake heuristics) cache the profile, from
+which the value at any degradation is read.
+
+Typical usage:
+
+    heuristic = as_heuristic(domain.heuristics['gap'][0])
+    h = heuristic.prepare(problem, degradation=0)
+    value = h(problem.initial)
+"""
+
+__all__ = ['Heuristic', 'FunctionHeuristic', 'CachedHeuristic', 'as_heuristic']
+
+import abc
+import functools
+import inspect
+
+from src.search.utils.datastructures import LRUCache
+
+
+class Heuristic(abc.ABC):
+    """Base class for heuristics with a per-problem precomputation
+    step.
+
+    Subclasses must override bind() to return the evaluating callable
+    for a degradation, and may override precompute() to build the
+    tables of a goal. They may also override bind_batch() to evaluate
+    many states at once, bind_profile() to give a profile of a state
+    from which the value at every degradation is read, and stats() to
+    report counters such as cache hits.
+
+    Subclasses whose construction depends on searcher settings list
+    them in settings_args, holding each constructor argument as an
+    attribute of the same name.
+
+    Attributes:
+        settings_args: A dict mapping the name of each searcher setting
+            which configures the heuristic to the constructor argument
+            it gives.
+        problem: The problem whose tables are held, or None.
+        tables: A dict of {id(goal): tables} for goals of problem.
+        n_precomputed: Number of times tables have been built.
+    """
+
+    settings_args = {}
+
+    def __init__(self):
+        """Initializes Heuristic with no tables."""
+        self.problem = None
+        self.tables = {}
+        self.n_precomputed = 0
+        self._cached = {}
+        self._configured = {}
+
+    def configure(self, settings):
+        """Returns the heuristic to use under the settings of a
+        searcher: self, unless a setting of settings_args differs from
+        the argument self was constructed with, in which case a
+        heuristic constructed with the settings is returned. Equal
+        settings give the same object, so that its tables are shared by
+        every searcher.
+
+        Args:
+            settings: A dict of the searcher's settings.
+        """
+        changed = {arg: settings[name] for name, arg in self.settings_args.items()
+                   if name in settings and settings[name] != getattr(self, arg)}
+        if not changed:
+            return self
+        key = repr(sorted(changed.items()))
+        if key not in self._configured:
+            args = {arg: getattr(self, arg) for arg in inspect.signature(type(self)).parameters}
+            self._configured[key] = type(self)(**{**args, **changed})
+        return self._configured[key]
+
+    def cached(self, maxsize):
+        """Returns a CachedHeuristic holding at most maxsize values of
+        self per goal, or self if maxsize is None or 0. Equal sizes give
+        the same object, so that its cache is shared by every searcher.
+
+        Args:
+            maxsize: Greatest number of states whose values are held
+                per goal of a problem.
+        """
+        if not maxsize:
+            return self
+        if maxsize not in self._cached:
+            self._cached[maxsize] = CachedHeuristic(self, maxsize)
+        return self._cached[maxsize]
+
+    def prepare(self, problem, degradation, goal=None):
+        """Returns a callable evaluating the heuristic towards goal.
+
+        Args:
+            problem: A namedtuple instance representing a problem.
+            degradation: An integer between 0 and 10 inclusive.
+            goal: State towards which the heuristic estimates, by
+                default the goal of problem.
+
+        Returns:
+            A callable h(state, parent=None), where parent is the
+            optional Node from which state was generated.
+        """
+        if goal is None:
+            goal = problem.goal
+        return self.bind(self._tables_for(problem, goal), degradation, goal, problem)
+
+    def prepare_batch(self, problem, degradation, goal=None):
+        """Returns a callable evaluating the heuristic towards goal for
+        a list of states at once, or None if the heuristic has no batch
+        form.
+
+        Args:
+            problem: A namedtuple instance representing a problem.
+            degradation: An integer between 0 and 10 inclusive.
+            goal: State towards which the heuristic estimates, by
+                default the goal of problem.
+
+        Returns:
+            A callable hs(states) giving a list of the h-values of
+            states, or None.
+        """
+        if goal is None:
+            goal = problem.goal
+        return self.bind_batch(self._tables_for(problem, goal), degradation, goal, problem)
+
+    def precompute(self, problem, goal):
+        """Returns the tables derived from goal, or None if the
+        heuristic uses none.
+
+        Args:
+            problem: A namedtuple instance representing a problem.
+            goal: State towards which the heuristic estimates.
+        """
+        return None
+
+    @abc.abstractmethod
+    def bind(self, tables, degradation, goal, problem):
+        """Returns the evaluating callable h(state, parent=None).
+
+        Args:
+            tables: Object returned by precompute() for goal.
+            degradation: An integer between 0 and 10 inclusive.
+            goal: State towards which the heuristic estimates.
+            problem: A namedtuple instance representing a problem.
+        """
+
+    def bind_batch(self, tables, degradation, goal, problem):
+        """Returns the batch evaluating callable hs(states), or None if
+        the heuristic has no batch form.
+
+        Args:
+            tables: Object returned by precompute() for goal.
+            degradation: An integer between 0 and 10 inclusive.
+            goal: State towards which the heuristic estimates.
+            problem: A namedtuple instance representing a problem.
+        """
+        return None
+
+    def bind_profile(self, tables, goal, problem):
+        """Returns the profile form of the heuristic, or None if it has
+        none. A profile of a state is a sequence holding the
+        heuristic's value at every degradation.
+
+        Args:
+            tables: Object returned by precompute() for goal.
+            goal: State towards which the heuristic estimates.
+            problem: A namedtuple instance representing a problem.
+
+        Returns:
+            A (profile, index) tuple of callables, where profile(state)
+            gives the profile of state, and index(degradation) gives
+            the index in a profile of the value at degradation, or
+            None.
+        """
+        return None
+
+    def stats(self, goal=None):
+        """Returns counters of the heuristic's work since it was last
+        prepared, by default none.
+
+        Args:
+            goal: State towards which the heuristic was prepared, whose
+                counters are given, as a heuristic may be prepared
+                towards both goals of a problem. By default, the goal
+                last prepared.
+
+        Returns:
+            A dict of {'stat': value}.
+        """
+        return {}
+
+    def _tables_for(self, problem, goal):
+        """Returns the tables of goal for problem, building them if
+        they are not held."""
+        if problem is not self.problem:
+            self.problem, self.tables = problem, {}
+        key = id(goal)
+        if key not in self.tables:
+            self.tables[key] = self.precompute(problem, goal)
+            self.n_precomputed += 1
+        return self.tables[key]
+
+    def __repr__(self):
+        return f'{type(self).__name__}()'
+
+
+class FunctionHeuristic(Heuristic):
+    """Adapter for heuristic functions of the form
+    f(state, goal, degradation, problem, parent=None), which have
+    nothing to precompute.
+
+    Attributes:
+        function: The wrapped heuristic function.
+    """
+
+    def __init__(self, function):
+        """Initializes FunctionHeuristic wrapping function."""
+        super().__init__()
+        self.function = function
+
+    def bind(self, tables, degradation, goal, problem):
+        """Returns the function with the goal, degradation and problem bound."""
+        return functools.partial(self.function, goal=goal, degradation=degradation, problem=problem)
+
+    def __repr__(self):
+        return f'FunctionHeuristic({self.function.__name__})'
+
+
+class CachedHeuristic(Heuristic):
+    """Heuristic memoizing the values of another in a per-problem LRU
+    cache for each goal, keyed by state description.
+
+    The cache is kept for as long as the same problem is prepared, so
+    that every searcher and degradation run on a problem shares it. If
+    the wrapped heuristic has a profile form, the profile of a state is
+    cached, and serves every degradation. Otherwise values are cached
+    per degradation.
+
+    Attributes:
+        heuristic: The wrapped Heuristic.
+        maxsize: Greatest number of entries held per goal.
+        cache: The LRUCache last prepared, or None. The cache of each
+            goal is held with its tables.
+    """
+
+    def __init__(self, heuristic, maxsize):
+        """Initializes CachedHeuristic wrapping heuristic."""
+        super().__init__()
+        self.heuristic = heuristic
+        self.maxsize = maxsize
+        self.cache = None
+
+    def precompute(self, problem, goal):
+        """Returns the wrapped heuristic's tables and an empty value cache."""
+        return self.heuristic._tables_for(problem, goal), LRUCache(self.maxsize)
+
+    def bind(self, tables, degradation, goal, problem):
+        """Returns the callable memoizing the values, or profiles, of the wrapped heuristic."""
+        tables, cache = tables
+        cache.reset_stats()
+        self.cache = cache
+        profile = self.heuristic.bind_profile(tables, goal, problem)
+        if profile is not None:
+            profile, index = profile
+            k = index(degradation)
+
+            def cached_heuristic(state, parent=None):
+                key = state.state
+                values = cache.get(key)
+                if values is None:
+                    values = profile(state)
+                    cache.put(key, values)
+                return values[k]
+            return cached_heuristic
+        h = self.heuristic.bind(tables, degradation, goal, problem)
+
+        def cached_heuristic(state, parent=None):
+            key = degradation, state.state
+            value = cache.get(key)
+            if value is None:
+                value = h(state, parent=parent)
+                cache.put(key, value)
+            return value
+        return cached_heuristic
+
+    def stats(self, goal=None):
+        """Returns the wrapped heuristic's counters, and the lookup and
+        eviction counters of the cache of goal, by default the cache
+        last prepared."""
+        cache = self.cache if goal is None else self.tables.get(id(goal), (None, None))[1]
+        if cache is None:
+            return self.heuristic.stats(goal=goal)
+        return {**self.heuristic.stats(goal=goal),
+                **{f'value_cache_{stat}': value for stat, value in cache.stats().items()}}
+
+    def __repr__(self):
+        return f'CachedHeuristic({self.heuristic}, maxsize={self.maxsize})'
+
+
+# FunctionHeuristic of each function, so that every searcher wrapping a
+# function shares its tables and cache
+_function_heuristics = {}
+
+
+def as_heuristic(obj):
+    """Returns obj if it is a Heuristic, or a FunctionHeuristic
+    wrapping it otherwise. A function is wrapped once.
+
+    Args:
+        obj: A Heuristic, or a heuristic function.
+    """
+    if isinstance(obj, Heuristic):
+        return obj
+    if obj not in _function_heuristics:
+        _function_heuristics[obj] = FunctionHeuristic(obj)
+    return _function_heuristics[obj]
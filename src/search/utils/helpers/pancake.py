@@ -0,0 +1,519 @@
+"""Helpers shared by the pancake domains.
+
+Pancake states are tuples whose first element is the plate (the largest
+pancake), which is never flipped. The remaining n - 1 pancakes form a
+permutation, which can be ranked into a dense integer in
+[0, (n - 1)!) using the linear-time ranking of Myrvold and Ruskey.
+
+A stack can also be packed into a single int, with a fixed number of
+bits per pancake, for a compact and cheaply hashed state encoding.
+
+Flipping the pancakes at and above index i reverses stack[i:]. The
+children of a stack are produced from per-size tables of item getters,
+or for many stacks at once by a single NumPy fancy-indexing call.
+
+A flip changes exactly one adjacency of a stack, between the pancakes
+at i - 1 and i, so gap-based heuristic values of a child can be updated
+from those of its parent in constant time, or counted for many stacks
+at once by vectorized comparison of goal positions. The running totals
+of the gaps from the plate up give the value of a heuristic at every
+degradation cutoff at once.
+
+Typical usage:
+
+    r = rank_state((6, 4, 5, 3, 2, 1))
+    assert unrank_state(r, 6) == (6, 4, 5, 3, 2, 1)
+    assert unpack(*pack((6, 4, 5, 3, 2, 1))) == (6, 4, 5, 3, 2, 1)
+    for i, child in flips((6, 4, 5, 3, 2, 1)):
+        print(i, child)
+"""
+
+__all__ = ['rank', 'unrank', 'rank_state', 'unrank_state', 'n_ranks', 'rank_state_of', 'n_ranks_of',
+           'pack', 'unpack', 'PackedStateMixin', 'intern_state', 'flip_index',
+           'flip_getters', 'flips', 'flip_index_array', 'batch_flips',
+           'stop_index', 'positions', 'gaps', 'gaps_after_flip', 'goal_gaps_after_flip',
+           'batch_gaps', 'batch_goal_gaps', 'gap_profile', 'goal_gap_profile']
+
+import functools
+import math
+import operator
+
+import numpy as np
+
+# Byte translation tables for packing two 4-bit pancakes per byte.
+_SHIFT_HIGH = bytes((i << 4) & 0xff for i in range(256))
+_LOW = bytes(i & 0xf for i in range(256))
+_HIGH = bytes(i >> 4 for i in range(256))
+
+
+def rank(perm):
+    """Ranks a permutation of 0 .. m-1 into an integer in [0, m!).
+
+    Args:
+        perm: A sequence containing each of 0 .. m-1 once.
+
+    Returns:
+        A non-negative integer, unique to perm.
+    """
+    pi = list(perm)
+    inv = [0] * len(pi)
+    for i, v in enumerate(pi):
+        inv[v] = i
+    r, factor = 0, 1
+    for n in range(len(pi), 1, -1):
+        s = pi[n - 1]
+        j = inv[n - 1]
+        pi[n - 1], pi[j] = pi[j], pi[n - 1]
+        inv[s], inv[n - 1] = inv[n - 1], inv[s]
+        r += s * factor
+        factor *= n
+    return r
+
+
+def unrank(r, m):
+    """Inverse of rank, giving the permutation of 0 .. m-1 with rank r.
+
+    Args:
+        r: An integer in [0, m!).
+        m: Length of the permutation.
+
+    Returns:
+        A tuple containing each of 0 .. m-1 once.
+    """
+    pi = list(range(m))
+    for n in range(m, 1, -1):
+        r, s = divmod(r, n)
+        pi[n - 1], pi[s] = pi[s], pi[n - 1]
+    return tuple(pi)
+
+
+def rank_state(state):
+    """Ranks a pancake state tuple by the permutation above its plate.
+
+    Args:
+        state: A tuple of pancakes, plate first.
+
+    Returns:
+        An integer in [0, (len(state) - 1)!).
+    """
+    plate = state[0]
+    return rank([p - 1 - (p > plate) for p in state[1:]])
+
+
+def unrank_state(r, n, plate=None):
+    """Inverse of rank_state.
+
+    Args:
+        r: An integer in [0, (n - 1)!).
+        n: Number of pancakes in the state, including the plate.
+        plate: Pancake used as the plate. Defaults to n.
+
+    Returns:
+        A tuple of pancakes, plate first.
+    """
+    plate = n if plate is None else plate
+    return (plate,) + tuple(p + 1 + (p + 1 >= plate) for p in unrank(r, n - 1))
+
+
+def n_ranks(n):
+    """Returns the number of distinct ranks of pancake states with n
+    pancakes, including the plate."""
+    return math.factorial(n - 1)
+
+
+def rank_state_of(state):
+    """Ranks a State object of a pancake domain into a dense integer,
+    for use as an index into array-based closed-lists.
+
+    Args:
+        state: A state of a pancake domain.
+
+    Returns:
+        An integer in [0, n_ranks_of(state)).
+    """
+    return rank_state(state.state)
+
+
+def n_ranks_of(state):
+    """Returns the number of ranks of State objects with as many
+    pancakes as state.
+
+    Args:
+        state: A state of a pancake domain.
+    """
+    return n_ranks(len(state.state))
+
+
+def pack(state):
+    """Packs a stack of pancakes into an int, with the plate in the
+    lowest bits. Pancakes take 4 bits each if all are below 16, and 8
+    bits otherwise.
+
+    Args:
+        state: A tuple of positive integer pancakes, below 256.
+
+    Returns:
+        A tuple (packed, width) of the packed int and the number of
+            bits per pancake.
+    """
+    b = bytes(state)
+    if max(b) < 16:
+        return (int.from_bytes(b[0::2], 'little')
+                | int.from_bytes(b[1::2].translate(_SHIFT_HIGH), 'little')), 4
+    return int.from_bytes(b, 'little'), 8
+
+
+def unpack(packed, width):
+    """Inverse of pack. As pancakes are positive, the stack ends at the
+    first empty field.
+
+    Args:
+        packed: An int given by pack.
+        width: Number of bits per pancake.
+
+    Returns:
+        A tuple of pancakes, plate first.
+    """
+    b = packed.to_bytes((packed.bit_length() + 7) // 8, 'little')
+    if width == 8:
+        return tuple(b)
+    out = bytearray(2 * len(b))
+    out[0::2] = b.translate(_LOW)
+    out[1::2] = b.translate(_HIGH)
+    return tuple(out.rstrip(b'\0'))
+
+
+class PackedStateMixin:
+    """Mixin for a pancake State class, holding the stack packed into a
+    single int rather than a tuple.
+
+    The packed int is computed once, so that hashing and equality, as
+    used in every open- and closed-list lookup, compare a single small
+    int rather than every pancake of a tuple. The stack is unpacked
+    into a tuple on each access of the state attribute.
+
+    Attributes:
+        packed: The stack packed into an int, as given by pack.
+        width: Number of bits per pancake in packed.
+        n_successors: Number of successors of the state.
+        successors_list: Lazily-calculated list of (state, cost)
+            tuples, as the successors of self.
+        flip: Index of the flip giving the state from its parent, or
+            None if the state is interned or has no parent.
+    """
+
+    __slots__ = ('packed', 'width', 'n_successors', 'successors_list', 'flip')
+
+    def __init__(self, state):
+        """Initializes the state from a tuple of pancakes."""
+        self.packed, self.width = pack(state)
+        self.n_successors = len(state) - 2
+        self.successors_list = None
+        self.flip = None
+
+    @property
+    def state(self):
+        """The stack of pancakes as a tuple, plate first."""
+        return unpack(self.packed, self.width)
+
+    def __hash__(self):
+        return hash(self.packed)
+
+    def __eq__(self, other):
+        return self is other or self.packed == other.packed
+
+
+def intern_state(state, problem, flip=None):
+    """Returns the instance of a state held in the problem's intern
+    table, adding state to the table if it is not yet there. If the
+    problem has no intern table, state is returned unchanged, with the
+    flip that gave it recorded.
+
+    Interned states are shared by both directions of search and by
+    every searcher run on the problem, along with their lazily
+    calculated successors. As they are reached from many parents, no
+    flip is recorded on them.
+
+    Args:
+        state: A newly created State object.
+        problem: namedtuple instance representing the problem.
+        flip: Index of the flip giving state from its parent.
+
+    Returns:
+        A State object equal to state.
+    """
+    table = problem.intern
+    if table is None:
+        state.flip = flip
+        return state
+    return table.setdefault(state, state)
+
+
+def flip_index(parent, state):
+    """Returns the index of the flip giving state from the stack
+    parent: the flip recorded on state when its parent's successors
+    were created, or, for an interned state, the index in parent of
+    the pancake flipped to the top of state.
+
+    Args:
+        parent: A tuple of pancakes.
+        state: A State object, child of parent.
+    """
+    i = state.flip
+    return i if i is not None else parent.index(state.state[-1])
+
+
+@functools.lru_cache(maxsize=None)
+def flip_getters(n):
+    """Returns the flip operators for stacks of n pancakes.
+
+    Args:
+        n: Number of pancakes in the stack, including the plate.
+
+    Returns:
+        A tuple of (i, getter) pairs, for each flip index i from 1 to
+            n - 2, where getter(stack) returns the stack with
+            stack[i:] reversed.
+    """
+    return tuple((i, operator.itemgetter(*range(i), *range(n - 1, i - 1, -1)))
+                 for i in range(1, n - 1))
+
+
+def flips(stack):
+    """Returns the children of a stack, with the flip giving each.
+
+    Args:
+        stack: A tuple of pancakes, plate first.
+
+    Returns:
+        A list of (i, child) pairs, in increasing order of flip index
+            i, where child is stack with stack[i:] reversed.
+    """
+    return [(i, getter(stack)) for i, getter in flip_getters(len(stack))]
+
+
+@functools.lru_cache(maxsize=None)
+def flip_index_array(n):
+    """Returns a read-only array of shape (n - 2, n), whose row j
+    indexes a stack of n pancakes in the order given by the flip at
+    index j + 1."""
+    index = np.array([list(range(i)) + list(range(n - 1, i - 1, -1)) for i in range(1, n - 1)],
+                     dtype=np.intp)
+    index.flags.writeable = False
+    return index
+
+
+def batch_flips(stacks):
+    """Returns the children of one or many stacks of equal size in a
+    single fancy-indexing call.
+
+    Args:
+        stacks: An array-like of shape (n,) or (m, n), of stacks of n
+            pancakes.
+
+    Returns:
+        An array of shape (n - 2, n) or (m, n - 2, n), whose entry
+            [..., j, :] is the child given by the flip at index j + 1.
+    """
+    stacks = np.asarray(stacks)
+    return stacks[..., flip_index_array(stacks.shape[-1])]
+
+
+@functools.lru_cache(maxsize=64)
+def positions(stack):
+    """Returns a tuple pos, such that pos[p] is the index of pancake p
+    in stack. Two pancakes a and b are adjacent in stack if and only if
+    abs(pos[a] - pos[b]) == 1.
+
+    Args:
+        stack: A tuple of pancakes.
+    """
+    pos = [0] * (max(stack) + 1)
+    for k, p in enumerate(stack):
+        pos[p] = k
+    return tuple(pos)
+
+
+def stop_index(n, degradation):
+    """Returns the cutoff of the pancake heuristics at a degradation:
+    the index of the first pair of a stack of n pancakes which is not
+    counted, as the top (degradation / 10) of the pancakes are ignored.
+    Goal positions 1 to stop_index(n, degradation) are those tracked.
+    The cutoff is -1 at degradation 10.
+
+    Args:
+        n: Number of pancakes in the stack, including the plate.
+        degradation: An integer between 0 and 10 inclusive.
+    """
+    return (n - 1) - math.floor((degradation / 10) * n)
+
+
+def gaps(stack, goal_pos, stop, start=0, weight=None):
+    """Returns the total weight of the gaps of stack at indices
+    start <= k < stop, being the pairs (stack[k], stack[k + 1]) which
+    are not adjacent in the goal.
+
+    Args:
+        stack: A tuple of pancakes.
+        goal_pos: Positions of the pancakes in the goal, as given by
+            positions.
+        stop: Index of the first pair not counted.
+        start: Index of the first pair counted.
+        weight: Optional function of the two pancakes of a gap, giving
+            its weight. Each gap weighs 1 by default.
+    """
+    h = 0
+    for k in range(start, stop):
+        a, b = stack[k], stack[k + 1]
+        if abs(goal_pos[a] - goal_pos[b]) != 1:
+            h += 1 if weight is None else weight(a, b)
+    return h
+
+
+def gaps_after_flip(parent_h, parent, child, i, goal_pos, stop, weight=None):
+    """Returns gaps(child, goal_pos, stop, weight=weight), given the
+    value parent_h of the same for the parent of child.
+
+    Only the pair at i - 1 of a flip at i changes, unless the pairs at
+    and above i are reversed across stop, in which case those pairs
+    below stop are recounted.
+
+    Args:
+        parent_h: gaps(parent, goal_pos, stop, weight=weight).
+        parent: A tuple of pancakes.
+        child: The tuple given by a flip of parent.
+        i: Index of the flip, as given by flip_index.
+        goal_pos: Positions of the pancakes in the goal, as given by
+            positions.
+        stop: Index of the first pair not counted.
+        weight: Optional function of the two pancakes of a gap, giving
+            its weight. Each gap weighs 1 by default.
+    """
+    h = parent_h
+    if i - 1 < stop:
+        h += (gaps(child, goal_pos, i, start=i - 1, weight=weight)
+              - gaps(parent, goal_pos, i, start=i - 1, weight=weight))
+    if i < stop < len(child) - 1:
+        h += (gaps(child, goal_pos, stop, start=i, weight=weight)
+              - gaps(parent, goal_pos, stop, start=i, weight=weight))
+    return h
+
+
+def goal_gaps_after_flip(parent_h, parent, child, i, goal_pos, stop, weight=None):
+    """As gaps_after_flip, but for the reverse count: the total weight
+    of the pairs of the goal at indices k < stop which are not adjacent
+    in the stack. The flip at i breaks the adjacency of parent[i - 1]
+    and parent[i], and joins parent[i - 1] to parent[-1].
+
+    Args:
+        parent_h: The weight of the goal's pairs not adjacent in
+            parent.
+        parent: A tuple of pancakes.
+        child: The tuple given by a flip of parent.
+        i: Index of the flip, as given by flip_index.
+        goal_pos: Positions of the pancakes in the goal, as given by
+            positions.
+        stop: Index of the first pair of the goal not counted.
+        weight: Optional function of the two pancakes of a gap, giving
+            its weight. Each gap weighs 1 by default.
+    """
+    a = parent[i - 1]
+    h = parent_h
+    for b, sign in ((parent[i], 1), (parent[-1], -1)):
+        if abs(goal_pos[a] - goal_pos[b]) == 1 and min(goal_pos[a], goal_pos[b]) < stop:
+            h += sign * (1 if weight is None else weight(a, b))
+    return h
+
+
+def batch_gaps(stacks, goal_pos, stop, weight=None):
+    """As gaps, for each of many stacks of equal size at once.
+
+    Args:
+        stacks: An array of shape (m, n), of m stacks of n pancakes.
+        goal_pos: An array of the positions of the pancakes in the
+            goal, as given by positions.
+        stop: Index of the first pair not counted.
+        weight: Optional ufunc of two arrays of pancakes, such as
+            np.minimum, giving the weights of their gaps. Each gap
+            weighs 1 by default.
+
+    Returns:
+        An array of shape (m,) of the gap weights of the stacks.
+    """
+    stop = max(stop, 0)
+    pos = goal_pos[stacks[:, :stop + 1]]
+    gap = np.abs(pos[:, 1:] - pos[:, :-1]) != 1
+    if weight is None:
+        return gap.sum(axis=1)
+    return (gap * weight(stacks[:, :stop], stacks[:, 1:stop + 1])).sum(axis=1)
+
+
+def batch_goal_gaps(stacks, goal, stop, weight=None):
+    """Returns the reverse count of batch_gaps: for each stack, the
+    total weight of the pairs of the goal at indices k < stop which are
+    not adjacent in the stack.
+
+    Args:
+        stacks: An array of shape (m, n), of m stacks of n pancakes.
+        goal: An array of shape (n,), the goal stack.
+        stop: Index of the first pair of the goal not counted.
+        weight: Optional ufunc of two arrays of pancakes, such as
+            np.minimum, giving the weights of their gaps. Each gap
+            weighs 1 by default.
+
+    Returns:
+        An array of shape (m,) of the gap weights of the stacks.
+    """
+    stop = max(stop, 0)
+    m, n = stacks.shape
+    pos = np.empty((m, int(stacks.max(initial=0)) + 1), dtype=np.intp)
+    pos[np.arange(m)[:, None], stacks] = np.arange(n)
+    a, b = goal[:stop], goal[1:stop + 1]
+    gap = np.abs(pos[:, a] - pos[:, b]) != 1
+    if weight is None:
+        return gap.sum(axis=1)
+    return (gap * weight(a, b)).sum(axis=1)
+
+
+def gap_profile(stack, goal_pos, weight=None):
+    """Returns the list of gaps(stack, goal_pos, stop, weight=weight)
+    for every stop from 0 to len(stack) - 1, the running total of the
+    gap weights from the plate up.
+
+    Args:
+        stack: A tuple of pancakes.
+        goal_pos: Positions of the pancakes in the goal, as given by
+            positions.
+        weight: Optional function of the two pancakes of a gap, giving
+            its weight. Each gap weighs 1 by default.
+    """
+    profile = [0]
+    h = 0
+    for k in range(len(stack) - 1):
+        a, b = stack[k], stack[k + 1]
+        if abs(goal_pos[a] - goal_pos[b]) != 1:
+            h += 1 if weight is None else weight(a, b)
+        profile.append(h)
+    return profile
+
+
+def goal_gap_profile(stack, goal, weight=None):
+    """As gap_profile, but for the reverse count: the running total of
+    the weights of the pairs of the goal which are not adjacent in the
+    stack.
+
+    Args:
+        stack: A tuple of pancakes.
+        goal: The goal stack, as a tuple of pancakes.
+        weight: Optional function of the two pancakes of a gap, giving
+            its weight. Each gap weighs 1 by default.
+    """
+    pos = positions(stack)
+    profile = [0]
+    h = 0
+    for k in range(len(goal) - 1):
+        a, b = goal[k], goal[k + 1]
+        if abs(pos[a] - pos[b]) != 1:
+            h += 1 if weight is None else weight(a, b)
+        profile.append(h)
+    return profile
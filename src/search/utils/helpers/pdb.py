@@ -0,0 +1,260 @@
+"""Pattern database heuristics for the pancake domains.
+
+A pattern is a set of goal positions whose pancakes are tracked; the
+other pancakes are "don't care". An abstract state gives the positions
+of the tracked pancakes only, and is ranked into a dense integer. The
+distance of every abstract state from the abstract goal is found by a
+breadth-first (unit costs) or Dijkstra (arbitrary costs) search, run
+over whole layers of abstract states at once with NumPy, and stored in
+an array indexed by rank. As every flip is its own inverse at the same
+cost, this is the distance to the goal.
+
+By default arrays are built in memory, and the most recently used are
+kept for the rest of the process. If a directory is given, they are
+saved there as .npy files, named by domain, goal and pattern, and
+loaded memory-mapped, so that lookups read the file without copying it
+and every search of a run shares the same pages.
+
+When the cost of a flip depends only on where it is made (unit and
+arbitrary costs), the distances towards any goal equal those towards
+the canonical goal, so one database serves every goal. Otherwise a
+database is built per goal, and a flip whose cost depends on a
+"don't care" pancake is charged the smallest untracked pancake, so that
+the database stays admissible.
+
+Typical usage:
+
+    pdb_heuristic = PDBHeuristic(flip_cost, name='unit_pancake')
+    h = pdb_heuristic.configure({'pdb_size': 5}).prepare(problem, degradation=0)
+    value = h(problem.initial)
+"""
+
+__all__ = ['rank_pattern', 'build', 'load_or_build', 'PDBHeuristic']
+
+import functools
+import math
+import os
+
+import numpy as np
+
+from . import pancake
+from .heuristic import Heuristic
+
+
+def rank_pattern(pos, m):
+    """Ranks the positions of the tracked pancakes of an abstract state
+    into a dense integer, as a partial permutation.
+
+    Args:
+        pos: A sequence of the k distinct positions in [0, m) of the
+            tracked pancakes, in pattern order.
+        m: Number of positions.
+
+    Returns:
+        An integer in [0, m! / (m - k)!).
+    """
+    r, used = 0, 0
+    for j, p in enumerate(pos):
+        r = r * (m - j) + p - bin(used & ((1 << p) - 1)).count('1')
+        used |= 1 << p
+    return r
+
+
+def _batch_rank_pattern(pos, m):
+    """As rank_pattern, for each row of an array of shape (B, k)."""
+    r = np.zeros(pos.shape[0], dtype=np.intp)
+    for j in range(pos.shape[1]):
+        smaller = (pos[:, :j] < pos[:, j:j + 1]).sum(axis=1)
+        r = r * (m - j) + pos[:, j] - smaller
+    return r
+
+
+def build(goal, pattern, flip_cost):
+    """Builds the pattern database of goal for pattern.
+
+    As flip costs are positive integers, the search is Dijkstra's
+    algorithm with a queue of buckets by distance (breadth-first for
+    unit costs), and all abstract states of a bucket are expanded at
+    once with NumPy. Flips are costed on stacks in which the "don't
+    care" pancakes are given the smallest untracked pancake.
+
+    Args:
+        goal: The goal stack, as a tuple of pancakes.
+        pattern: A tuple of the goal positions (from 1 to n - 1) of the
+            tracked pancakes.
+        flip_cost: The domain's flip_cost(stack, i).
+
+    Returns:
+        An array of the distances of the abstract states, indexed by
+            rank_pattern, of the smallest unsigned type which holds
+            them.
+    """
+    n, m = len(goal), len(goal) - 1
+    tracked = np.array([goal[j] for j in pattern])
+    untracked = [p for p in goal[1:] if p not in tracked]
+    dont_care = min(untracked) if untracked else 0
+    size = math.perm(m, len(pattern))
+    dist = np.full(size, np.iinfo(np.int64).max, dtype=np.int64)
+    expanded = np.zeros(size, dtype=bool)
+
+    # An abstract state is the row of slots (stack indices less one) of
+    # the tracked pancakes. The flip at i reverses the slots from i - 1 up.
+    start = np.array([[j - 1 for j in pattern]], dtype=np.intp)
+    dist[_batch_rank_pattern(start, m)] = 0
+    buckets = {0: [start]}
+    while buckets:
+        d = min(buckets)
+        slots = np.concatenate(buckets.pop(d))
+        ranks = _batch_rank_pattern(slots, m)
+        ranks, first = np.unique(ranks, return_index=True)
+        new = (dist[ranks] == d) & ~expanded[ranks]
+        ranks, slots = ranks[new], slots[first[new]]
+        expanded[ranks] = True
+
+        stacks = np.full((len(slots), n), dont_care)
+        stacks[:, 0] = goal[0]
+        stacks[np.arange(len(slots))[:, None], slots + 1] = tracked
+        costs = np.array([[flip_cost(s, i) for i in range(1, n - 1)] for s in stacks.tolist()],
+                         dtype=np.int64).reshape(len(slots), n - 2)
+        for i in range(1, n - 1):
+            child = np.where(slots < i - 1, slots, m + i - 2 - slots)
+            child_ranks = _batch_rank_pattern(child, m)
+            c = d + costs[:, i - 1]
+            better = c < dist[child_ranks]
+            if not better.any():
+                continue
+            child, child_ranks, c = child[better], child_ranks[better], c[better]
+            np.minimum.at(dist, child_ranks, c)
+            for value in np.unique(c).tolist():
+                buckets.setdefault(value, []).append(child[c == value])
+    return dist.astype(np.min_scalar_type(int(dist.max())))
+
+
+@functools.lru_cache(maxsize=None)
+def _load(path):
+    """Returns the array saved at path, memory-mapped read-only."""
+    return np.load(path, mmap_mode='r')
+
+
+def load_or_build(directory, name, goal, pattern, flip_cost):
+    """Returns the pattern database of goal for pattern, loading it
+    from directory, or building and saving it there if absent.
+
+    Args:
+        directory: Directory holding the .npy files, or None to hold
+            the database in memory only.
+        name: Name of the domain, distinguishing cost models.
+        goal: The goal stack, as a tuple of pancakes.
+        pattern: A tuple of the goal positions of the tracked pancakes.
+        flip_cost: The domain's flip_cost(stack, i).
+    """
+    if directory is None:
+        return _build_in_memory(name, goal, pattern, flip_cost)
+    path = os.path.join(directory, f"{name}_{'-'.join(map(str, goal))}_{'-'.join(map(str, pattern))}.npy")
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f'{path[:-len(".npy")]}.{os.getpid()}.tmp.npy'
+        np.save(temp_path, build(goal, pattern, flip_cost))
+        os.replace(temp_path, path)
+    return _load(path)
+
+
+@functools.lru_cache(maxsize=64)
+def _build_in_memory(name, goal, pattern, flip_cost):
+    """Returns build(goal, pattern, flip_cost), keeping the databases
+    last used, as those of goal-dependent costs differ for every goal."""
+    return build(goal, pattern, flip_cost)
+
+
+class PDBHeuristic(Heuristic):
+    """Heuristic taking the greatest distance over several pattern
+    databases.
+
+    By default the positions of the goal below the degradation cutoff
+    are split into patterns of size consecutive positions, from the
+    bottom of the stack.
+
+    Heuristic can be degraded by specifying an integer
+    value 0 <= x <= 10, where 0 is perfect heuristic, and 10 is blind.
+    Degradation involves ignoring the top (degradation / 10)% of the
+    pancakes, which are left out of every pattern.
+
+    Attributes:
+        flip_cost: The domain's flip_cost(stack, i).
+        name: Name of the domain, used to name the database files.
+        positional: Whether flip costs depend only on the flip's
+            position, so that the canonical goal's databases serve
+            every goal.
+        size: Number of pancakes tracked per default pattern.
+        patterns: A list of patterns, each a list of goal positions,
+            replacing the default patterns if given.
+        directory: Directory of the database files, or None (the
+            default) to hold them in memory only.
+    """
+
+    settings_args = {'pdb_size': 'size', 'pdb_patterns': 'patterns', 'pdb_dir': 'directory'}
+
+    def __init__(self, flip_cost, name, positional=True, size=5, patterns=None, directory=None):
+        """Initializes PDBHeuristic with no tables."""
+        super().__init__()
+        self.flip_cost = flip_cost
+        self.name = name
+        self.positional = positional
+        self.size = size
+        self.patterns = patterns
+        self.directory = directory
+
+    def precompute(self, problem, goal):
+        """Returns the goal relabelled by goal position, the goal of every database."""
+        g = goal.state
+        if self.positional:
+            g = tuple(range(len(g), 0, -1))
+        return g
+
+    def bind(self, pdb_goal, degradation, goal, problem):
+        """Returns the callable taking the greatest value over the databases."""
+        tracked, pdbs = self._databases(pdb_goal, degradation, goal)
+        m = len(pdb_goal) - 1
+        positions = pancake.positions
+
+        def pdb_heuristic(state, parent=None):
+            pos = positions(state.state)
+            return max((int(pdb[rank_pattern([pos[p] - 1 for p in t], m)]) for t, pdb in zip(tracked, pdbs)),
+                       default=0)
+        return pdb_heuristic
+
+    def bind_batch(self, pdb_goal, degradation, goal, problem):
+        """Returns the vectorized form of bind(), for a list of states."""
+        tracked, pdbs = self._databases(pdb_goal, degradation, goal)
+        m = len(pdb_goal) - 1
+        tracked = [np.array(t, dtype=np.intp) for t in tracked]
+
+        def pdb_heuristic_batch(states):
+            stacks = np.array([state.state for state in states])
+            pos = np.empty((len(stacks), len(pdb_goal) + 1), dtype=np.intp)
+            pos[np.arange(len(stacks))[:, None], stacks] = np.arange(len(pdb_goal))
+            h = np.zeros(len(stacks), dtype=np.int64)
+            for t, pdb in zip(tracked, pdbs):
+                np.maximum(h, pdb[_batch_rank_pattern(pos[:, t] - 1, m)], out=h)
+            return h.tolist()
+        return pdb_heuristic_batch
+
+    def _databases(self, pdb_goal, degradation, goal):
+        """Returns the tracked pancakes of goal for each pattern, and
+        the pattern databases, loading or building them as needed."""
+        n = len(pdb_goal)
+        stop_condition = pancake.stop_index(n, degradation)
+        if self.patterns is not None:
+            patterns = [[j for j in pattern if 0 < j <= stop_condition] for pattern in self.patterns]
+        else:
+            below = list(range(1, stop_condition + 1))
+            patterns = [below[k:k + self.size] for k in range(0, len(below), self.size)]
+        patterns = [tuple(pattern) for pattern in patterns if pattern]
+        g = goal.state
+        tracked = [tuple(g[j] for j in pattern) for pattern in patterns]
+        pdbs = [load_or_build(self.directory, self.name, pdb_goal, pattern, self.flip_cost)
+                for pattern in patterns]
+        return tracked, pdbs
+
+    def __repr__(self):
+        return f'PDBHeuristic({self.name}, size={self.size}, patterns={self.patterns})'
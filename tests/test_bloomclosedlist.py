@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import random
+
+import pytest
+
+from src.search.domains import unit_pancake
+from src.search.utils.datastructures import BloomClosedList, Node
+
+
+def packed_states(n):
+    """Returns the packed states of every stack of n pancakes, in a
+    random order."""
+    stacks = [(n,) + stack for stack in itertools.permutations(range(1, n))]
+    random.Random(n).shuffle(stacks)
+    return [unit_pancake.PackedState(stack) for stack in stacks]
+
+
+@pytest.mark.parametrize('n_hashes', [2, 4])
+def test_false_positive_rate(n_hashes):
+    states = packed_states(9)
+    added, others = states[:5000], states[5000:]
+    closed = BloomClosedList(size=2 ** 16, n_hashes=n_hashes)
+    for state in added:
+        closed.append(Node(state=state, g=0))
+    # Closed states are never missed
+    assert all(state in closed for state in added)
+    target = closed.false_positive_rate()
+    rate = sum(state in closed for state in others) / len(others)
+    assert rate <= 1.5 * target + 0.002
+
+
+def test_empty():
+    closed = BloomClosedList(size=64)
+    assert unit_pancake.PackedState((4, 1, 2, 3)) not in closed
+    assert len(closed) == 0
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import math
+import random
+
+import pytest
+
+from src.search.utils.helpers import pancake
+
+
+@pytest.mark.parametrize('m', range(1, 7))
+def test_rank_unrank(m):
+    ranks = set()
+    for perm in itertools.permutations(range(m)):
+        r = pancake.rank(perm)
+        assert 0 <= r < math.factorial(m)
+        assert pancake.unrank(r, m) == perm
+        ranks.add(r)
+    assert len(ranks) == math.factorial(m)
+
+
+@pytest.mark.parametrize('n', range(2, 8))
+def test_rank_state_unrank_state(n):
+    for stack in itertools.permutations(range(1, n)):
+        state = (n,) + stack
+        r = pancake.rank_state(state)
+        assert 0 <= r < pancake.n_ranks(n)
+        assert pancake.unrank_state(r, n) == state
+
+
+def test_rank_state_other_plate():
+    # Arbitrary-cost problems may use a pancake other than the largest as the plate
+    for stack in itertools.permutations((1, 2, 4, 5)):
+        state = (3,) + stack
+        assert pancake.unrank_state(pancake.rank_state(state), 5, plate=3) == state
+
+
+@pytest.mark.parametrize('n', [2, 5, 15, 16, 40, 255])
+def test_pack_unpack(n):
+    rng = random.Random(n)
+    for _ in range(20):
+        state = (n,) + tuple(rng.sample(range(1, n), n - 1))
+        packed, width = pancake.pack(state)
+        assert width == (4 if n < 16 else 8)
+        assert pancake.unpack(packed, width) == state
+
+
+def test_packed_state_equality():
+    class State(pancake.PackedStateMixin):
+        pass
+
+    a, b, c = State((6, 1, 2, 3, 4, 5)), State((6, 1, 2, 3, 4, 5)), State((6, 2, 1, 3, 4, 5))
+    assert a == b and hash(a) == hash(b)
+    assert a != c
+    assert a.state == (6, 1, 2, 3, 4, 5)
+
+
+def goal_gaps(stack, goal, stop, weight=None):
+    """Recounts the weight of the pairs of goal at indices k < stop
+    which are not adjacent in stack."""
+    pos = pancake.positions(stack)
+    return sum(1 if weight is None else weight(a, b)
+               for a, b in zip(goal[:stop], goal[1:stop + 1]) if abs(pos[a] - pos[b]) != 1)
+
+
+@pytest.mark.parametrize('weight', [None, min])
+def test_gaps_after_flip(weight):
+    rng = random.Random(0)
+    n = 8
+    for _ in range(30):
+        parent = (n,) + tuple(rng.sample(range(1, n), n - 1))
+        goal = (n,) + tuple(rng.sample(range(1, n), n - 1))
+        goal_pos = pancake.positions(goal)
+        for stop in range(-1, n):
+            parent_h = pancake.gaps(parent, goal_pos, stop, weight=weight)
+            parent_goal_h = goal_gaps(parent, goal, stop, weight=weight)
+            for i, child in pancake.flips(parent):
+                assert (pancake.gaps_after_flip(parent_h, parent, child, i, goal_pos, stop, weight=weight)
+                        == pancake.gaps(child, goal_pos, stop, weight=weight))
+                assert (pancake.goal_gaps_after_flip(parent_goal_h, parent, child, i, goal_pos, stop, weight=weight)
+                        == goal_gaps(child, goal, stop, weight=weight))
+
+
+def test_flip_index():
+    class State:
+        def __init__(self, state, flip=None):
+            self.state = state
+            self.flip = flip
+
+    parent = (6, 3, 1, 5, 2, 4)
+    for i, child in pancake.flips(parent):
+        # Recorded on the child, or found in the parent for interned states
+        assert pancake.flip_index(parent, State(child, flip=i)) == i
+        assert pancake.flip_index(parent, State(child)) == i
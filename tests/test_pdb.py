@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+import heapq
+import itertools
+
+import pytest
+
+from src.search.domains import arbitrary_pancake, arbitrary_pancake_v2, unit_pancake
+from src.search.utils.helpers import pancake, pdb
+
+DOMAINS = [(unit_pancake, True), (arbitrary_pancake, True), (arbitrary_pancake_v2, False)]
+
+
+def exact_distances(goal, flip_cost):
+    """Returns the cost of the cheapest path from every stack to goal,
+    by Dijkstra's algorithm from goal over the reversed flips. As every
+    flip is its own inverse, the stacks reaching a stack c are its
+    flips p, by the flip at the same index."""
+    dist = {goal: 0}
+    queue = [(0, goal)]
+    while queue:
+        d, stack = heapq.heappop(queue)
+        if d > dist[stack]:
+            continue
+        for i, parent in pancake.flips(stack):
+            c = d + flip_cost(parent, i)
+            if c < dist.get(parent, float('inf')):
+                dist[parent] = c
+                heapq.heappush(queue, (c, parent))
+    return dist
+
+
+@pytest.mark.parametrize('domain, positional', DOMAINS)
+@pytest.mark.parametrize('patterns', [None, [[1, 2], [3, 4], [5, 6]], [[2, 5, 6], [1, 4]]])
+@pytest.mark.parametrize('degradation', [0, 5])
+def test_pdb_admissible(domain, positional, patterns, degradation):
+    problem = domain.parse_problem('7 3 6 1 5 2 4')
+    heuristic = pdb.PDBHeuristic(domain.flip_cost, domain.__name__, positional=positional, size=3,
+                                 patterns=patterns)
+    # Towards the goal of the problem, and towards its initial state as in the backward direction
+    for goal in (problem.goal, problem.initial):
+        h = heuristic.prepare(problem, degradation, goal=goal)
+        for stack, d in exact_distances(goal.state, domain.flip_cost).items():
+            assert 0 <= h(domain.State(stack)) <= d
+
+
+@pytest.mark.parametrize('domain, positional', DOMAINS)
+def test_pdb_full_pattern_is_exact(domain, positional):
+    problem = domain.parse_problem('6 3 1 5 2 4')
+    heuristic = pdb.PDBHeuristic(domain.flip_cost, domain.__name__, positional=positional,
+                                 patterns=[[1, 2, 3, 4, 5]])
+    for goal in (problem.goal, problem.initial):
+        h = heuristic.prepare(problem, 0, goal=goal)
+        hs = heuristic.prepare_batch(problem, 0, goal=goal)
+        distances = exact_distances(goal.state, domain.flip_cost)
+        stacks = list(distances)
+        assert [h(domain.State(stack)) for stack in stacks] == [distances[stack] for stack in stacks]
+        assert list(hs([domain.State(stack) for stack in stacks])) == [distances[stack] for stack in stacks]
+
+
+def test_rank_pattern_is_dense():
+    m, k = 6, 3
+    ranks = sorted(pdb.rank_pattern(pos, m) for pos in itertools.permutations(range(m), k))
+    assert ranks == list(range(len(ranks)))
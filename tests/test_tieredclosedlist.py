@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+
+from src.search.utils.datastructures import Node, StateTable, TieredClosedList
+
+
+def nodes(states):
+    return [Node(state=state, g=0) for state in states]
+
+
+def test_membership_across_spills_and_merges():
+    closed = TieredClosedList(budget=3, max_runs=2)
+    added = [(k, k + 1) for k in range(40)]
+    for k, node in enumerate(nodes(added)):
+        closed.append(node)
+        # Every state closed so far is found, whether in memory, in a run or in a merged run
+        assert all(state in closed for state in added[:k + 1])
+        assert len(closed) == k + 1
+    assert closed.spills == 13
+    assert len(closed.runs) <= closed.max_runs
+    stats = closed.stats()
+    assert stats['in_memory'] + stats['on_disk'] == len(added)
+    assert not any((k, k + 2) in closed for k in range(40))
+    closed.close()
+
+
+def test_duplicates_are_not_counted():
+    closed = TieredClosedList(budget=2, max_runs=1)
+    for node in nodes([(1,), (2,), (3,), (1,), (2,), (3,)]):
+        closed.append(node)
+    assert len(closed) == 3
+    assert closed.stats()['in_memory'] + closed.stats()['on_disk'] == 3
+    closed.close()
+
+
+def test_remove():
+    closed = TieredClosedList(budget=2)
+    first, second, third = nodes([(1,), (2,), (3,)])
+    for node in (first, second, third):
+        closed.append(node)
+    closed.remove(third)
+    assert third.state not in closed and len(closed) == 2
+    with pytest.raises(Exception):
+        closed.remove(first)
+    with pytest.raises(KeyError):
+        closed.remove((4,))
+    closed.close()
+
+
+def test_close_deletes_runs(tmp_path):
+    directory = tmp_path / 'spill'
+    closed = TieredClosedList(budget=2, directory=str(directory), max_runs=2)
+    for node in nodes([(k,) for k in range(10)]):
+        closed.append(node)
+    assert len(os.listdir(directory)) == len(closed.runs) > 0
+    closed.close()
+    assert os.listdir(directory) == []
+
+
+def test_close_deletes_temporary_directory():
+    closed = TieredClosedList(budget=1)
+    for node in nodes([(1,), (2,)]):
+        closed.append(node)
+    directory = closed.directory
+    assert os.path.isdir(directory)
+    closed.close()
+    assert not os.path.exists(directory)
+    assert closed.directory is None
+
+
+def test_spill_after_close():
+    closed = TieredClosedList(budget=2)
+    first, second, third, fourth = nodes([(1,), (2,), (3,), (4,)])
+    closed.append(first)
+    closed.append(second)
+    closed.close()
+    closed.close()
+    # States can still be added in memory, but not spilled to the deleted directory
+    closed.append(third)
+    assert third.state in closed
+    with pytest.raises(Exception, match='after close'):
+        closed.append(fourth)
+
+
+def test_state_table_release(tmp_path):
+    table = StateTable(closedlist=TieredClosedList(budget=2, directory=str(tmp_path)))
+    for node in nodes([(k,) for k in range(6)]):
+        table.add(node)
+        table.close(node)
+    assert all((k,) in table for k in range(6))
+    assert os.listdir(tmp_path)
+    table.release()
+    assert os.listdir(tmp_path) == []
+
+
+def test_invalid_settings():
+    with pytest.raises(Exception):
+        TieredClosedList(budget=0)
+    with pytest.raises(Exception):
+        TieredClosedList(max_runs=0)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+import functools
+import random
+
+import numpy as np
+import pytest
+
+from src.search.domains import tsp
+
+
+class Parent:
+    """Stands in for the node from which a state is generated."""
+
+    def __init__(self, state):
+        self.state = state
+
+
+def remaining_costs(distances):
+    """Returns a function giving the cost of the cheapest path from a
+    city through a frozenset of cities back to city 0."""
+    @functools.lru_cache(maxsize=None)
+    def rest(city, cities):
+        if not cities:
+            return distances.item(city, 0)
+        return min(distances.item(city, other) + rest(other, cities - {other}) for other in cities)
+    return rest
+
+
+@pytest.mark.parametrize('encoding', ['cities', 'bitmask'])
+@pytest.mark.parametrize('seed', range(3))
+def test_held_karp_admissible(encoding, seed):
+    rng = random.Random(seed)
+    n_cities = 7
+    problem = tsp.parse_problem(','.join(f'{rng.uniform(0, 1000):.3f} {rng.uniform(0, 1000):.3f}'
+                                         for _ in range(n_cities)), encoding=encoding)
+    rest = remaining_costs(problem.statics[1])
+    for heuristic, start in ((tsp.held_karp_heuristic_fw, problem.initial),
+                             (tsp.held_karp_heuristic_bw, problem.goal)):
+        h = heuristic.configure({'held_karp_iterations': 10}).prepare(problem, 0)
+        assert h(start) > 0
+        # Every state reachable in the direction, evaluated from a parent as in search
+        stack, seen = [(start, None)], set()
+        while stack:
+            state, parent = stack.pop()
+            if state in seen:
+                continue
+            seen.add(state)
+            current = next(iter(state.positions(0))) % n_cities
+            unvisited = frozenset(k % n_cities for k in state.positions(heuristic.direction)) - {0, current}
+            exact = rest(current, unvisited) if current != 0 or unvisited else 0
+            assert h(state, parent=parent) <= exact + 1e-9
+            stack.extend((child, Parent(state)) for child, _ in state.successors(problem))
+
+
+def test_held_karp_counts_steps_taken():
+    rng = random.Random(0)
+    problem = tsp.parse_problem(','.join(f'{rng.uniform(0, 1000):.3f} {rng.uniform(0, 1000):.3f}'
+                                         for _ in range(8)))
+    distances = problem.statics[1]
+    _, _, steps = tsp._held_karp(distances, 0, np.zeros(8), 10)
+    assert 0 < steps <= 10
+    # From the far end of cities on a line the first tree is the path, so no step is taken
+    line = np.abs(np.subtract.outer(np.arange(5.0), np.arange(5.0)))
+    bound, _, steps = tsp._held_karp(line, 4, np.zeros(5), 10)
+    assert steps == 0 and bound == pytest.approx(4)
+    heuristic = tsp.held_karp_heuristic_fw.configure({'held_karp_iterations': 10})
+    heuristic.prepare(problem, 0)(problem.initial)
+    assert heuristic.stats()['iterations'] <= 10
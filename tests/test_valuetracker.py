@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import math
+import random
+
+import pytest
+
+from src.search.utils.datastructures import ValueTracker
+
+
+@pytest.mark.parametrize('n_values', [3, 50, 1000])
+def test_against_multiset(n_values):
+    rng = random.Random(n_values)
+    tracker, held = ValueTracker(), collections.Counter()
+    for _ in range(20000):
+        if held and rng.random() < 0.5:
+            value = rng.choice(list(held))
+            tracker.remove(value)
+            held[value] -= 1
+            if not held[value]:
+                del held[value]
+        else:
+            value = rng.randrange(n_values) / 2
+            tracker.add(value)
+            held[value] += 1
+        assert tracker.min() == (min(held) if held else math.inf)
+        assert tracker.max() == (max(held) if held else -math.inf)
+        assert len(tracker) == len(held)
+    # Values removed below the top do not accumulate in the heaps beyond
+    # the bound checked when a new distinct value is added
+    tracker.add(-1)
+    assert len(tracker._low) <= 2 * len(tracker) + 17
+
+
+def test_remove_missing():
+    tracker = ValueTracker()
+    tracker.add(1)
+    tracker.remove(1)
+    assert 1 not in tracker
+    with pytest.raises(KeyError):
+        tracker.remove(1)